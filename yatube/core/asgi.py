@@ -0,0 +1,189 @@
+import asyncio
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.wsgi import get_wsgi_application
+
+from .templates_warmup import warm_up
+
+END = object()
+# Сколько частей потокового ответа может ждать отправки клиенту.
+STREAM_BUFFER = 8
+
+
+def build_environ(scope, body):
+    """WSGI-окружение для HTTP-запроса ASGI."""
+    server_name, server_port = scope.get('server') or ('localhost', 80)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', ''),
+        'PATH_INFO': scope['path'].encode().decode('latin-1'),
+        'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+        'SERVER_NAME': server_name,
+        'SERVER_PORT': str(server_port),
+        'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': BytesIO(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': True,
+        'wsgi.run_once': False,
+    }
+    if scope.get('client'):
+        environ['REMOTE_ADDR'] = scope['client'][0]
+    for name, value in scope.get('headers', ()):
+        name = name.decode('latin-1').upper().replace('-', '_')
+        value = value.decode('latin-1')
+        if name not in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+            name = f'HTTP_{name}'
+        if name in environ:
+            value = f'{environ[name]},{value}'
+        environ[name] = value
+    return environ
+
+
+class ResponseStream:
+    """Очередь между потоком, читающим WSGI-ответ, и циклом событий.
+    Ограниченный размер не даёт потоку обогнать медленного клиента."""
+
+    def __init__(self, loop, maxsize=STREAM_BUFFER):
+        self.loop = loop
+        self.queue = asyncio.Queue(maxsize)
+        self.closed = False
+
+    def put(self, item):
+        """Передаёт сообщение из потока пула. False, если клиент
+        больше не читает ответ и чтение пора прекратить."""
+        if self.closed and item is not END:
+            return False
+        asyncio.run_coroutine_threadsafe(
+            self.queue.put(item), self.loop
+        ).result()
+        return not self.closed
+
+    async def get(self):
+        return await self.queue.get()
+
+    async def close(self, finished):
+        """Останавливает чтение и ждёт, пока поток закроет ответ."""
+        self.closed = True
+        while not finished:
+            finished = await self.queue.get() is END
+
+
+class ASGIHandler:
+    """ASGI-приложение поверх WSGI-обработчика Django.
+
+    Django 2.2 не умеет асинхронных view, поэтому запрос целиком
+    (ORM, шаблоны) выполняется в пуле потоков, а цикл событий
+    только принимает соединения и пересылает тела запросов и
+    ответов. Потоковый ответ читается и закрывается в том же потоке,
+    что его создал, части передаются в цикл через ResponseStream.
+    """
+
+    def __init__(self, wsgi_application, max_workers):
+        self.wsgi_application = wsgi_application
+        self.executor = ThreadPoolExecutor(
+            max_workers, thread_name_prefix='asgi'
+        )
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            raise ValueError(
+                f'Неподдерживаемый тип соединения: {scope["type"]}'
+            )
+        body = await self.read_body(receive)
+        if body is None:
+            return
+        loop = asyncio.get_running_loop()
+        stream = ResponseStream(loop)
+        worker = loop.run_in_executor(
+            self.executor, self.run, build_environ(scope, body), stream
+        )
+        finished = False
+        try:
+            while True:
+                message = await stream.get()
+                if message is END:
+                    finished = True
+                    break
+                await send(message)
+        finally:
+            await stream.close(finished)
+        await worker
+
+    def run(self, environ, stream):
+        """Выполняет WSGI-запрос в потоке пула и передаёт ответ
+        в stream. Потоковый ответ читается по частям и закрывается
+        здесь же, поэтому весь ответ обслуживает один поток."""
+        started = {}
+
+        def start_response(status, headers, exc_info=None):
+            started['status'] = int(status.split(' ', 1)[0])
+            started['headers'] = [
+                (name.lower().encode('latin-1'), value.encode('latin-1'))
+                for name, value in headers
+            ]
+
+        try:
+            response = self.wsgi_application(environ, start_response)
+            try:
+                self.send_response(response, started, stream)
+            finally:
+                response.close()
+        finally:
+            stream.put(END)
+
+    def send_response(self, response, started, stream):
+        stream.put({
+            'type': 'http.response.start',
+            'status': started['status'],
+            'headers': started['headers'],
+        })
+        if not getattr(response, 'streaming', False):
+            stream.put({
+                'type': 'http.response.body', 'body': b''.join(response)
+            })
+            return
+        for chunk in response:
+            if not stream.put({
+                'type': 'http.response.body',
+                'body': chunk,
+                'more_body': True,
+            }):
+                return
+        stream.put({'type': 'http.response.body'})
+
+    async def read_body(self, receive):
+        """Тело запроса или None, если клиент отключился."""
+        chunks = []
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return None
+            chunks.append(message.get('body', b''))
+            if not message.get('more_body'):
+                return b''.join(chunks)
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                self.executor.shutdown(wait=True)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def get_asgi_application():
+    handler = ASGIHandler(get_wsgi_application(), settings.ASGI_THREADS)
+    if settings.TEMPLATE_WARMUP:
+        warm_up()
+    return handler
@@ -0,0 +1,43 @@
+from django.db.backends.sqlite3 import base
+
+DEFAULT_PRAGMAS = {
+    # Читатели не ждут писателя, запись не блокирует чтение.
+    'journal_mode': 'wal',
+    # В режиме WAL fsync только при контрольной точке.
+    'synchronous': 'normal',
+    'mmap_size': 256 * 1024 * 1024,
+    # Отрицательное значение - размер в килобайтах.
+    'cache_size': -64 * 1024,
+    'temp_store': 'memory',
+}
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """SQLite с настройками для нескольких одновременных запросов.
+
+    Дополнительные ключи OPTIONS:
+    pragmas - PRAGMA, выполняемые при открытии соединения, поверх
+    DEFAULT_PRAGMAS;
+    transaction_mode - режим BEGIN транзакций (IMMEDIATE сразу берёт
+    блокировку записи, и конкурирующий писатель ждёт busy timeout,
+    а не получает ошибку при повышении блокировки).
+    Ожидание занятой базы задаёт стандартный ключ timeout (секунды).
+    """
+
+    def get_connection_params(self):
+        params = super().get_connection_params()
+        self.pragmas = {**DEFAULT_PRAGMAS, **params.pop('pragmas', {})}
+        self.transaction_mode = params.pop('transaction_mode', None)
+        return params
+
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        for name, value in self.pragmas.items():
+            connection.execute(f'PRAGMA {name} = {value}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        if self.transaction_mode:
+            self.cursor().execute(f'BEGIN {self.transaction_mode}')
+        else:
+            super()._start_transaction_under_autocommit()
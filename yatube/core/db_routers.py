@@ -0,0 +1,71 @@
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+
+PRIMARY = 'default'
+
+_local = threading.local()
+
+
+def start_request():
+    _local.use_replica = False
+    _local.wrote = False
+
+
+def use_replica():
+    """Чтения текущего запроса пойдут на реплики."""
+    _local.use_replica = True
+
+
+@contextmanager
+def read_primary():
+    """Чтения внутри блока идут в основную базу. Так заполняется общий
+    кэш: ключи в нём по поколению ленты, и запомненная отставшая
+    реплика жила бы до истечения записи, а не до синхронизации."""
+    previous = getattr(_local, 'use_replica', False)
+    _local.use_replica = False
+    try:
+        yield
+    finally:
+        _local.use_replica = previous
+
+
+def finish_request():
+    """Завершает запрос, возвращает, была ли в нём запись."""
+    wrote = getattr(_local, 'wrote', False)
+    _local.__dict__.clear()
+    return wrote
+
+
+class ReplicaRouter:
+    """Направляет чтения моделей REPLICA_APPS на случайную реплику из
+    DATABASE_REPLICAS, если запрос разрешил это (use_replica). Запись
+    всегда идёт в основную базу и отмечается, чтобы закрепить сессию
+    за основной базой."""
+
+    def db_for_read(self, model, **hints):
+        if (
+            getattr(_local, 'use_replica', False)
+            and not getattr(_local, 'wrote', False)
+            and settings.DATABASE_REPLICAS
+            and model._meta.app_label in settings.REPLICA_APPS
+        ):
+            return random.choice(settings.DATABASE_REPLICAS)
+        return PRIMARY
+
+    def db_for_write(self, model, **hints):
+        if hasattr(_local, 'wrote'):
+            _local.wrote = True
+        return PRIMARY
+
+    def allow_relation(self, obj1, obj2, **hints):
+        databases = {PRIMARY, *settings.DATABASE_REPLICAS}
+        if {obj1._state.db, obj2._state.db} <= databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Реплики получают схему копированием основной базы.
+        return db not in settings.DATABASE_REPLICAS
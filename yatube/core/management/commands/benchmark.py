@@ -0,0 +1,179 @@
+import json
+import logging
+import math
+import time
+from importlib import import_module
+
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, reverse
+from django.utils.encoding import force_bytes
+from django.utils.http import urlsafe_base64_encode
+
+from posts.models import Group, Post, User
+
+URLCONFS = ('posts.urls', 'users.urls', 'about.urls')
+CLIENTS = ('anonymous', 'authenticated')
+
+
+def percentile(values, percent):
+    """Перцентиль по методу ближайшего ранга."""
+    ordered = sorted(values)
+    rank = max(math.ceil(percent / 100 * len(ordered)), 1)
+    return ordered[rank - 1]
+
+
+def benchmark_routes():
+    """Автор с наибольшим числом постов и пары (имя, URL) всех
+    именованных маршрутов URLCONFS с аргументами из его данных."""
+    author = User.objects.filter(
+        posts__isnull=False
+    ).order_by('-stats__posts_count').first()
+    group = Group.objects.filter(posts__isnull=False).first()
+    if author is None or group is None:
+        raise CommandError(
+            'Нет данных для замера, заполните базу командой seed_posts'
+        )
+    url_args = {
+        'slug': group.slug,
+        'username': author.username,
+        'post_id': Post.objects.filter(author=author).first().pk,
+        'uidb64': urlsafe_base64_encode(force_bytes(author.pk)),
+        'token': default_token_generator.make_token(author),
+    }
+    routes = []
+    for urlconf in URLCONFS:
+        module = import_module(urlconf)
+        for pattern in module.urlpatterns:
+            if not isinstance(pattern, URLPattern) or not pattern.name:
+                continue
+            name = f'{module.app_name}:{pattern.name}'
+            kwargs = {
+                key: url_args[key] for key in pattern.pattern.converters
+            }
+            routes.append((name, reverse(name, kwargs=kwargs)))
+    return author, routes
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет задержку, число SQL-запросов и размер ответа '
+        'для всех маршрутов posts, users и about'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=50,
+            help='Число замеров каждого маршрута',
+        )
+        parser.add_argument(
+            '--json', dest='json_path',
+            help='Сохранить результаты в JSON-файл',
+        )
+        parser.add_argument(
+            '--compare',
+            help='JSON-файл прошлого прогона для сравнения p50',
+        )
+
+    def handle(self, *args, **options):
+        # Ошибки маршрутов попадают в отчёт, а не в лог запросов.
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        author, routes = benchmark_routes()
+        clients = {name: Client() for name in CLIENTS}
+        results = []
+        for name, url in routes:
+            for client_name, client in clients.items():
+                results.append(self.measure(
+                    name, url, client_name, client, author,
+                    options['iterations'],
+                ))
+        self.report(results)
+        if options['compare']:
+            self.compare(results, options['compare'])
+        if options['json_path']:
+            with open(options['json_path'], 'w') as output:
+                json.dump({
+                    'created': time.time(),
+                    'iterations': options['iterations'],
+                    'results': results,
+                }, output, ensure_ascii=False, indent=2)
+
+    def measure(self, name, url, client_name, client, user, iterations):
+        timings = []
+        queries = size = status = 0
+        for number in range(iterations + 1):
+            if (
+                client_name == 'authenticated'
+                and '_auth_user_id' not in client.session
+            ):
+                client.force_login(user)
+            try:
+                with CaptureQueriesContext(connection) as captured:
+                    started = time.perf_counter()
+                    response = client.get(url)
+                    elapsed = time.perf_counter() - started
+            except Exception as error:
+                self.stderr.write(f'{name} ({client_name}): {error!r}')
+                return {
+                    'route': name,
+                    'url': url,
+                    'client': client_name,
+                    'error': repr(error),
+                }
+            if number == 0:
+                # Первый запрос прогревает кэши и не учитывается.
+                continue
+            timings.append(elapsed * 1000)
+            queries = len(captured)
+            size = len(response.content)
+            status = response.status_code
+        return {
+            'route': name,
+            'url': url,
+            'client': client_name,
+            'status': status,
+            'p50_ms': percentile(timings, 50),
+            'p95_ms': percentile(timings, 95),
+            'p99_ms': percentile(timings, 99),
+            'queries': queries,
+            'bytes': size,
+        }
+
+    def report(self, results):
+        self.stdout.write(
+            f'{"маршрут":<36}{"клиент":<15}{"код":>5}{"p50":>9}'
+            f'{"p95":>9}{"p99":>9}{"SQL":>5}{"байт":>9}'
+        )
+        for result in results:
+            if 'error' in result:
+                self.stdout.write(self.style.ERROR(
+                    f'{result["route"]:<36}{result["client"]:<15}ошибка'
+                ))
+                continue
+            self.stdout.write(
+                f'{result["route"]:<36}{result["client"]:<15}'
+                f'{result["status"]:>5}{result["p50_ms"]:>9.2f}'
+                f'{result["p95_ms"]:>9.2f}{result["p99_ms"]:>9.2f}'
+                f'{result["queries"]:>5}{result["bytes"]:>9}'
+            )
+
+    def compare(self, results, path):
+        with open(path) as baseline_file:
+            baseline = {
+                (result['route'], result['client']): result
+                for result in json.load(baseline_file)['results']
+            }
+        self.stdout.write(self.style.MIGRATE_HEADING('Сравнение p50'))
+        for result in results:
+            before = baseline.get((result['route'], result['client']))
+            if before is None or 'error' in before or 'error' in result:
+                continue
+            delta = result['p50_ms'] - before['p50_ms']
+            style = self.style.ERROR if delta > 0 else self.style.SUCCESS
+            self.stdout.write(style(
+                f'{result["route"]:<36}{result["client"]:<15}'
+                f'{before["p50_ms"]:>9.2f} -> {result["p50_ms"]:.2f} мс'
+            ))
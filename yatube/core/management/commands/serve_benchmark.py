@@ -0,0 +1,177 @@
+import asyncio
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import count
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.wsgi import get_wsgi_application
+from django.test import Client
+from django.urls import reverse
+
+from core.asgi import ASGIHandler, build_environ
+from posts.models import Group, Post, User
+
+from .benchmark import percentile
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает пропускную способность WSGI- и ASGI-пути на лентах '
+        'при заданном числе одновременных соединений (в процессе, '
+        'без сети)'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--concurrency', type=int, nargs='+',
+            default=[100, 250, 500, 1000],
+            help='Числа одновременных соединений',
+        )
+        parser.add_argument(
+            '--requests', type=int, default=2000,
+            help='Число запросов на каждый замер',
+        )
+        parser.add_argument(
+            '--wsgi-workers', type=int, default=8,
+            help='Число потоков WSGI-сервера',
+        )
+        parser.add_argument(
+            '--authenticated', action='store_true',
+            help='Запросы от авторизованного пользователя, мимо кэша страниц',
+        )
+        parser.add_argument(
+            '--json', dest='json_path',
+            help='Сохранить результаты в JSON-файл',
+        )
+
+    def handle(self, *args, **options):
+        author = User.objects.filter(
+            posts__isnull=False
+        ).order_by('-stats__posts_count').first()
+        group = Group.objects.filter(posts__isnull=False).first()
+        if author is None or group is None:
+            raise CommandError(
+                'Нет данных для замера, заполните базу командой seed_posts'
+            )
+        urls = [
+            reverse('posts:index'),
+            reverse('posts:group_list', args=[group.slug]),
+            reverse('posts:profile', args=[author.username]),
+            reverse('posts:post_detail', args=[
+                Post.objects.filter(author=author).values_list(
+                    'pk', flat=True
+                ).first()
+            ]),
+        ]
+        headers = [(b'host', settings.ALLOWED_HOSTS[0].encode())]
+        if options['authenticated']:
+            client = Client()
+            client.force_login(author)
+            cookie = client.cookies[settings.SESSION_COOKIE_NAME]
+            headers.append(
+                (b'cookie', f'{cookie.key}={cookie.value}'.encode())
+            )
+        wsgi = get_wsgi_application()
+        asgi = ASGIHandler(wsgi, settings.ASGI_THREADS)
+        wsgi_pool = ThreadPoolExecutor(options['wsgi_workers'])
+        results = []
+        self.stdout.write(
+            f'{"путь":<6}{"соединений":>12}{"запр/с":>10}'
+            f'{"p50":>9}{"p99":>9}{"ошибок":>8}'
+        )
+        for concurrency in options['concurrency']:
+            for name, call in (
+                ('wsgi', self.wsgi_call(wsgi, wsgi_pool)),
+                ('asgi', self.asgi_call(asgi)),
+            ):
+                result = asyncio.run(self.measure(
+                    call, urls, headers, concurrency, options['requests']
+                ))
+                result.update(path=name, concurrency=concurrency)
+                results.append(result)
+                self.stdout.write(
+                    f'{name:<6}{concurrency:>12}{result["rps"]:>10.1f}'
+                    f'{result["p50_ms"]:>9.1f}{result["p99_ms"]:>9.1f}'
+                    f'{result["errors"]:>8}'
+                )
+        wsgi_pool.shutdown()
+        asgi.executor.shutdown()
+        if options['json_path']:
+            with open(options['json_path'], 'w') as output:
+                json.dump({
+                    'created': time.time(),
+                    'requests': options['requests'],
+                    'wsgi_workers': options['wsgi_workers'],
+                    'asgi_threads': settings.ASGI_THREADS,
+                    'results': results,
+                }, output, ensure_ascii=False, indent=2)
+
+    def wsgi_call(self, wsgi, pool):
+        """Запрос к WSGI-приложению в пуле потоков сервера."""
+        def run(environ):
+            statuses = []
+            response = wsgi(
+                environ, lambda status, headers: statuses.append(status)
+            )
+            try:
+                b''.join(response)
+            finally:
+                response.close()
+            return int(statuses[0].split(' ', 1)[0])
+
+        async def call(scope):
+            return await asyncio.get_running_loop().run_in_executor(
+                pool, run, build_environ(scope, b'')
+            )
+        return call
+
+    def asgi_call(self, asgi):
+        async def call(scope):
+            messages = []
+
+            async def receive():
+                return {'type': 'http.request', 'body': b''}
+
+            async def send(message):
+                messages.append(message)
+
+            await asgi(scope, receive, send)
+            return messages[0]['status']
+        return call
+
+    async def measure(self, call, urls, headers, concurrency, total):
+        numbers = count()
+        timings = []
+        errors = 0
+
+        async def connection():
+            nonlocal errors
+            for number in numbers:
+                if number >= total:
+                    return
+                path = urls[number % len(urls)]
+                scope = {
+                    'type': 'http',
+                    'method': 'GET',
+                    'path': path,
+                    'query_string': b'',
+                    'headers': headers,
+                    'server': ('localhost', 80),
+                }
+                started = time.perf_counter()
+                status = await call(scope)
+                timings.append((time.perf_counter() - started) * 1000)
+                if status != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(connection() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+        return {
+            'rps': total / elapsed,
+            'p50_ms': percentile(timings, 50),
+            'p99_ms': percentile(timings, 99),
+            'errors': errors,
+        }
@@ -0,0 +1,80 @@
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+
+from posts.models import User
+
+from .benchmark import percentile
+
+PROFILES = {
+    'db': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.db',
+        'AUTHENTICATION_BACKENDS': [
+            'django.contrib.auth.backends.ModelBackend',
+        ],
+    },
+    'cached': {
+        'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+        'AUTHENTICATION_BACKENDS': ['users.backends.CachedModelBackend'],
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет накладные расходы авторизованного запроса: сессия '
+        'и пользователь из базы против сессии и пользователя из кэша'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=200,
+            help='Число запросов для каждого профиля',
+        )
+        parser.add_argument(
+            '--url', default=reverse('about:author'),
+            help='Страница для замера, по умолчанию без запросов view',
+        )
+
+    def handle(self, *args, **options):
+        user = User.objects.order_by('pk').first()
+        if user is None:
+            raise CommandError(
+                'Нет пользователей, заполните базу командой seed_posts'
+            )
+        self.stdout.write(
+            f'{"профиль":<10}{"SQL":>5}{"p50":>9}{"p95":>9}{"p99":>9}'
+        )
+        for name, profile in PROFILES.items():
+            with override_settings(**profile):
+                cache.clear()
+                result = self.measure(user, options['url'], options)
+            self.stdout.write(
+                f'{name:<10}{result["queries"]:>5}{result["p50_ms"]:>9.2f}'
+                f'{result["p95_ms"]:>9.2f}{result["p99_ms"]:>9.2f}'
+            )
+
+    def measure(self, user, url, options):
+        client = Client()
+        client.force_login(user)
+        # Первый запрос прогревает кэши и не учитывается.
+        client.get(url)
+        timings = []
+        for _ in range(options['iterations']):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                response = client.get(url)
+                timings.append((time.perf_counter() - started) * 1000)
+        if response.status_code != 200:
+            raise CommandError(f'{url}: код ответа {response.status_code}')
+        return {
+            'queries': len(captured),
+            'p50_ms': percentile(timings, 50),
+            'p95_ms': percentile(timings, 95),
+            'p99_ms': percentile(timings, 99),
+        }
@@ -0,0 +1,147 @@
+import os
+import tempfile
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DatabaseError, connections, transaction
+from django.db.models import F
+
+from posts.models import AuthorStats, Post, User
+
+from .benchmark import percentile
+
+PROFILES = {
+    'stock': {
+        'ENGINE': 'django.db.backends.sqlite3',
+        'CONN_MAX_AGE': 0,
+        'OPTIONS': {},
+    },
+    'tuned': {
+        'ENGINE': 'core.backends.sqlite3',
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {'timeout': 20, 'transaction_mode': 'IMMEDIATE'},
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает стандартный SQLite и профиль settings_prod (WAL, '
+        'pragma, постоянные соединения) под одновременными чтениями '
+        'лент и публикациями. Замер идёт на копиях текущей базы.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--readers', type=int, default=8,
+            help='Число потоков, читающих ленту',
+        )
+        parser.add_argument(
+            '--writers', type=int, default=2,
+            help='Число потоков, публикующих посты',
+        )
+        parser.add_argument(
+            '--duration', type=float, default=5.0,
+            help='Длительность замера каждого профиля, секунды',
+        )
+
+    def handle(self, *args, **options):
+        author = User.objects.filter(posts__isnull=False).first()
+        if author is None:
+            raise CommandError(
+                'Нет данных для замера, заполните базу командой seed_posts'
+            )
+        self.stdout.write(
+            f'{"профиль":<8}{"чтений/с":>10}{"p99 чтения":>12}'
+            f'{"записей/с":>11}{"p99 записи":>12}{"ошибок":>8}'
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            for name, profile in PROFILES.items():
+                alias = f'benchmark_{name}'
+                connections.databases[alias] = {
+                    **profile,
+                    'NAME': os.path.join(directory, f'{name}.sqlite3'),
+                }
+                try:
+                    self.copy_database(alias, name)
+                    result = self.measure(alias, author.pk, options)
+                finally:
+                    connections[alias].close()
+                    del connections.databases[alias]
+                self.stdout.write(
+                    f'{name:<8}{result["reads"]:>10.1f}'
+                    f'{result["read_p99"]:>12.1f}{result["writes"]:>11.1f}'
+                    f'{result["write_p99"]:>12.1f}{result["errors"]:>8}'
+                )
+
+    def copy_database(self, alias, name):
+        source, target = connections['default'], connections[alias]
+        source.ensure_connection()
+        target.ensure_connection()
+        source.connection.backup(target.connection)
+        if name == 'stock':
+            # Копия наследует режим журнала исходной базы.
+            with target.cursor() as cursor:
+                cursor.execute('PRAGMA journal_mode = delete')
+        target.close()
+
+    def read(self, alias, author_id):
+        list(Post.objects.using(alias).select_related(
+            'author', 'group'
+        ).order_by('-pub_date')[:10])
+
+    def write(self, alias, author_id):
+        """Как post_create: пост и счётчик автора в одной транзакции."""
+        with transaction.atomic(using=alias):
+            Post.objects.using(alias).bulk_create([
+                Post(author_id=author_id, text='Замер одновременной записи')
+            ])
+            AuthorStats.objects.using(alias).filter(
+                author_id=author_id
+            ).update(posts_count=F('posts_count') + 1)
+
+    def measure(self, alias, author_id, options):
+        timings = {'read': [], 'write': []}
+        errors = []
+        stop = time.perf_counter() + options['duration']
+
+        def loop(kind, operation):
+            connection = connections[alias]
+            try:
+                while time.perf_counter() < stop:
+                    started = time.perf_counter()
+                    try:
+                        operation(alias, author_id)
+                    except DatabaseError:
+                        errors.append(kind)
+                        continue
+                    finally:
+                        # Граница запроса: без CONN_MAX_AGE соединение
+                        # закрывается, как после каждого запроса Django.
+                        connection.close_if_unusable_or_obsolete()
+                    timings[kind].append(
+                        (time.perf_counter() - started) * 1000
+                    )
+            finally:
+                connection.close()
+
+        threads = [
+            threading.Thread(target=loop, args=('read', self.read))
+            for _ in range(options['readers'])
+        ] + [
+            threading.Thread(target=loop, args=('write', self.write))
+            for _ in range(options['writers'])
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        duration = options['duration']
+        return {
+            'reads': len(timings['read']) / duration,
+            'read_p99': percentile(timings['read'] or [0], 99),
+            'writes': len(timings['write']) / duration,
+            'write_p99': percentile(timings['write'] or [0], 99),
+            'errors': len(errors),
+        }
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.db_routers import PRIMARY
+
+
+def sync_replica(alias):
+    """Копирует основную SQLite-базу в реплику через backup API."""
+    primary, replica = connections[PRIMARY], connections[alias]
+    if primary.vendor != 'sqlite' or replica.vendor != 'sqlite':
+        raise CommandError(
+            f'{alias}: копирование поддерживается только для SQLite, '
+            'для других СУБД используйте их репликацию'
+        )
+    primary.ensure_connection()
+    replica.ensure_connection()
+    primary.connection.backup(replica.connection)
+
+
+class Command(BaseCommand):
+    help = 'Обновляет SQLite-реплики копией основной базы'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'aliases', nargs='*',
+            help='Псевдонимы реплик, по умолчанию - DATABASE_REPLICAS',
+        )
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or settings.DATABASE_REPLICAS
+        if not aliases:
+            raise CommandError('Реплики не настроены (DATABASE_REPLICAS)')
+        for alias in aliases:
+            sync_replica(alias)
+            self.stdout.write(self.style.SUCCESS(f'{alias}: обновлена'))
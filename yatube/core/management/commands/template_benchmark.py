@@ -0,0 +1,96 @@
+import logging
+import re
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from core.templates_warmup import (django_engines, reset_templates,
+                                   template_names, uses_cached_loader,
+                                   warm_up)
+
+from .benchmark import benchmark_routes
+
+TEMPLATE_TIMING = re.compile(r'tpl;dur=([\d.]+)')
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет компиляцию каждого шаблона проекта и отрисовку '
+        'страниц: первый запрос после старта без прогрева, первый '
+        'запрос после прогрева и установившееся время. Запустите '
+        'с настройками разработки и settings_prod для сравнения.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--iterations', type=int, default=20,
+            help='Число замеров установившегося времени страницы',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.REQUEST_STATS_ENABLED:
+            raise CommandError(
+                'Время отрисовки берётся из Server-Timing, включите '
+                'REQUEST_STATS_ENABLED'
+            )
+        logging.getLogger('django.request').setLevel(logging.CRITICAL)
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            'Загрузчик шаблонов: ' + (
+                'кэширующий' if uses_cached_loader()
+                else 'без кэша, шаблоны разбираются на каждый запрос'
+            )
+        ))
+        self.compile_report()
+        self.render_report(options['iterations'])
+
+    def compile_report(self):
+        self.stdout.write(
+            f'{"шаблон":<48}{"компиляция":>12}{"повторно":>10}'
+        )
+        for engine in django_engines():
+            for name in template_names(engine):
+                reset_templates()
+                first = self.load(engine, name)
+                again = self.load(engine, name)
+                self.stdout.write(
+                    f'{name:<48}{first:>12.3f}{again:>10.3f}'
+                )
+
+    def load(self, engine, name):
+        started = time.perf_counter()
+        engine.get_template(name)
+        return (time.perf_counter() - started) * 1000
+
+    def render_report(self, iterations):
+        author, routes = benchmark_routes()
+        client = Client()
+        self.stdout.write(
+            f'{"маршрут":<36}{"код":>5}{"холодный":>10}'
+            f'{"прогретый":>11}{"стабильно":>11}'
+        )
+        for name, url in routes:
+            reset_templates()
+            cold = self.render(client, author, url)
+            reset_templates()
+            warm_up()
+            warmed = self.render(client, author, url)
+            steady = [
+                self.render(client, author, url)[1]
+                for _ in range(iterations)
+            ] or [0]
+            self.stdout.write(
+                f'{name:<36}{cold[0]:>5}{cold[1]:>10.2f}{warmed[1]:>11.2f}'
+                f'{statistics.median(steady):>11.2f}'
+            )
+
+    def render(self, client, author, url):
+        """Код ответа и время отрисовки шаблонов в миллисекундах.
+        Запросы авторизованные, чтобы не попадать в кэш страниц."""
+        if '_auth_user_id' not in client.session:
+            client.force_login(author)
+        response = client.get(url)
+        timing = TEMPLATE_TIMING.search(response.get('Server-Timing', ''))
+        return response.status_code, float(timing.group(1)) if timing else 0
@@ -0,0 +1,108 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from . import db_routers, request_stats, staticfiles
+
+
+class StaticFilesMiddleware:
+    """Отдаёт собранную collectstatic статику раньше остальных
+    middleware: сжатую копию по Accept-Encoding, файлы с хешем
+    в имени с заголовком immutable. Список файлов читается один
+    раз при старте процесса."""
+
+    def __init__(self, get_response):
+        if not settings.STATIC_SERVE:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.prefix = settings.STATIC_URL
+        self.assets = staticfiles.scan(
+            settings.STATIC_ROOT,
+            getattr(staticfiles_storage, 'hashed_files', {}).values(),
+        )
+
+    def __call__(self, request):
+        if (
+            request.method in ('GET', 'HEAD')
+            and request.path_info.startswith(self.prefix)
+        ):
+            asset = self.assets.get(request.path_info[len(self.prefix):])
+            if asset is not None:
+                return asset.response(request)
+        return self.get_response(request)
+
+
+class RequestStatsMiddleware:
+    """Собирает по каждому запросу число и время SQL-запросов,
+    время отрисовки шаблонов и размер ответа. Значения уходят
+    в заголовок Server-Timing и в общую статистику по view."""
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_STATS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        request_stats.start()
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(
+                        request_stats.query_wrapper
+                    ))
+                response = self.get_response(request)
+        finally:
+            stats = request_stats.finish()
+        total_ms = (time.perf_counter() - started) * 1000
+        size = 0 if response.streaming else len(response.content)
+        response['Server-Timing'] = (
+            f'db;dur={stats["db_ms"]:.2f};desc="{stats["queries"]} queries", '
+            f'tpl;dur={stats["template_ms"]:.2f}, '
+            f'total;dur={total_ms:.2f}'
+        )
+        match = request.resolver_match
+        request_stats.record(match.view_name if match else 'unresolved', {
+            'total_ms': total_ms,
+            'db_ms': stats['db_ms'],
+            'queries': stats['queries'],
+            'template_ms': stats['template_ms'],
+            'bytes': size,
+        })
+        return response
+
+
+class ReplicaMiddleware:
+    """Разрешает view из REPLICA_VIEWS читать с реплик. Запрос с записью
+    закрепляет сессию за основной базой на REPLICA_STICKY_SECONDS,
+    чтобы пользователь сразу видел свои изменения."""
+    pin_key = '_replica_pin_until'
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        db_routers.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            wrote = db_routers.finish_request()
+        if wrote and hasattr(request, 'session'):
+            request.session[self.pin_key] = (
+                time.time() + settings.REPLICA_STICKY_SECONDS
+            )
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if (
+            request.method in ('GET', 'HEAD')
+            and request.resolver_match.view_name in settings.REPLICA_VIEWS
+            and request.session.get(self.pin_key, 0) < time.time()
+        ):
+            db_routers.use_replica()
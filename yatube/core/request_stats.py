@@ -0,0 +1,86 @@
+import threading
+import time
+from collections import defaultdict
+
+_local = threading.local()
+_lock = threading.Lock()
+_totals = defaultdict(lambda: defaultdict(float))
+
+FIELDS = ('total_ms', 'db_ms', 'queries', 'template_ms', 'bytes')
+
+
+def start():
+    _local.current = {
+        'queries': 0, 'db_ms': 0.0, 'template_ms': 0.0, 'depth': 0
+    }
+
+
+def finish():
+    return _local.__dict__.pop('current', None)
+
+
+def current():
+    return getattr(_local, 'current', None)
+
+
+def query_wrapper(execute, sql, params, many, context):
+    """Обёртка connection.execute_wrapper: считает запросы и их время."""
+    stats = current()
+    if stats is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats['queries'] += 1
+        stats['db_ms'] += (time.perf_counter() - started) * 1000
+
+
+class template_timer:
+    """Учитывает время отрисовки только внешнего шаблона,
+    вложенные render_to_string уже входят в него."""
+
+    def __enter__(self):
+        self.stats = current()
+        if self.stats is not None:
+            self.stats['depth'] += 1
+            self.started = time.perf_counter()
+
+    def __exit__(self, *exc_info):
+        if self.stats is None:
+            return
+        self.stats['depth'] -= 1
+        if not self.stats['depth']:
+            self.stats['template_ms'] += (
+                time.perf_counter() - self.started
+            ) * 1000
+
+
+def record(view_name, values):
+    with _lock:
+        totals = _totals[view_name]
+        totals['requests'] += 1
+        for field in FIELDS:
+            totals[field] += values[field]
+
+
+def snapshot():
+    """Средние и суммарные значения по каждому view."""
+    with _lock:
+        items = [(name, dict(totals)) for name, totals in _totals.items()]
+    report = {}
+    for name, totals in sorted(
+        items, key=lambda item: item[1]['total_ms'], reverse=True
+    ):
+        requests = totals['requests']
+        report[name] = {
+            'requests': int(requests),
+            **{f'{field}_total': totals[field] for field in FIELDS},
+            **{f'{field}_avg': totals[field] / requests for field in FIELDS},
+        }
+    return report
+
+
+def reset():
+    with _lock:
+        _totals.clear()
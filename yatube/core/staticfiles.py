@@ -0,0 +1,145 @@
+import gzip
+import logging
+import mimetypes
+import os
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+try:
+    import brotli
+except ImportError:  # brotli - необязательная зависимость
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+COMPRESSIBLE = (
+    '.css', '.js', '.map', '.svg', '.ico', '.json', '.txt', '.xml',
+    '.html', '.eot', '.ttf', '.otf',
+)
+# Сжатая копия сохраняется, только если она заметно меньше исходника.
+MIN_SIZE = 256
+MIN_RATIO = 0.95
+ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+IMMUTABLE = 'public, max-age=31536000, immutable'
+ACCEPT_ENCODING = re.compile(r'\s*([\w*-]+)\s*(?:;\s*q=([\d.]+))?')
+
+
+def compress(path):
+    """Пишет рядом с файлом .gz и, если установлен brotli, .br.
+    Возвращает пути созданных копий."""
+    with open(path, 'rb') as source:
+        content = source.read()
+    if len(content) < MIN_SIZE:
+        return []
+    variants = {'.gz': gzip.compress(content, compresslevel=9, mtime=0)}
+    if brotli is not None:
+        variants['.br'] = brotli.compress(content)
+    created = []
+    for suffix, compressed in variants.items():
+        if len(compressed) > len(content) * MIN_RATIO:
+            continue
+        with open(path + suffix, 'wb') as target:
+            target.write(compressed)
+        created.append(path + suffix)
+    return created
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Статика с хешем содержимого в имени и заранее сжатыми
+    копиями .gz/.br, которые создаёт collectstatic."""
+
+    def post_process(self, paths, dry_run=False, **options):
+        names = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            yield name, hashed_name, processed
+            if not isinstance(processed, Exception):
+                names.update((name, hashed_name))
+        if dry_run:
+            return
+        for name in sorted(names):
+            if not name or not name.endswith(COMPRESSIBLE):
+                continue
+            for path in compress(self.path(name)):
+                compressed = os.path.relpath(path, self.location)
+                yield compressed, compressed, True
+
+    def stored_name(self, name):
+        """Файл, которого нет в манифесте, отдаётся по исходному имени:
+        ссылка на отсутствующую статику не должна ронять страницу."""
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            logger.warning('Статический файл %s не найден в манифесте', name)
+            return name
+
+
+class StaticAsset:
+    def __init__(self, path, immutable):
+        self.path = path
+        self.immutable = immutable
+        self.content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        self.variants = {
+            encoding: path + suffix
+            for encoding, suffix in ENCODINGS.items()
+            if os.path.exists(path + suffix)
+        }
+        self.last_modified = os.stat(path).st_mtime
+
+    def choose(self, accept_encoding):
+        """Кодировка и путь к файлу по заголовку Accept-Encoding."""
+        accepted = {}
+        for match in ACCEPT_ENCODING.finditer(accept_encoding or ''):
+            try:
+                accepted[match.group(1).lower()] = float(match.group(2) or 1)
+            except ValueError:
+                continue
+        for encoding, path in self.variants.items():
+            if accepted.get(encoding, accepted.get('*', 0)) > 0:
+                return encoding, path
+        return None, self.path
+
+    def response(self, request):
+        if not was_modified_since(
+            request.META.get('HTTP_IF_MODIFIED_SINCE'), self.last_modified
+        ):
+            return HttpResponseNotModified()
+        encoding, path = self.choose(request.META.get('HTTP_ACCEPT_ENCODING'))
+        response = FileResponse(
+            open(path, 'rb'), content_type=self.content_type
+        )
+        response['Last-Modified'] = http_date(self.last_modified)
+        response['Cache-Control'] = (
+            IMMUTABLE if self.immutable
+            else f'public, max-age={settings.STATIC_MAX_AGE}'
+        )
+        if self.variants:
+            response['Vary'] = 'Accept-Encoding'
+        if encoding:
+            response['Content-Encoding'] = encoding
+        return response
+
+
+def scan(root, hashed_names=()):
+    """Файлы STATIC_ROOT по URL-имени. Сжатые копии становятся
+    вариантами своих исходников, файлы с хешем в имени кэшируются
+    клиентами навсегда."""
+    hashed_names = set(hashed_names)
+    assets = {}
+    for directory, _, files in os.walk(root):
+        for filename in files:
+            path = os.path.join(directory, filename)
+            base, suffix = os.path.splitext(path)
+            if suffix in ENCODINGS.values() and os.path.exists(base):
+                continue
+            name = os.path.relpath(path, root).replace(os.sep, '/')
+            assets[name] = StaticAsset(path, name in hashed_names)
+    return assets
@@ -0,0 +1,105 @@
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loader_tags import ExtendsNode, IncludeNode
+from django.template.loaders.cached import Loader as CachedLoader
+
+logger = logging.getLogger(__name__)
+
+
+def django_engines():
+    return [
+        backend.engine for backend in engines.all()
+        if isinstance(backend, DjangoTemplates)
+    ]
+
+
+def template_dirs(engine, project_only=True):
+    """Каталоги, в которых ищут шаблоны загрузчики движка. Для
+    project_only только каталоги проекта, без шаблонов Django и
+    сторонних пакетов."""
+    dirs = []
+    for loader in engine.template_loaders:
+        for loader in getattr(loader, 'loaders', [loader]):
+            dirs.extend(loader.get_dirs())
+    root = os.path.join(os.path.abspath(settings.BASE_DIR), '')
+    return [
+        directory for directory in dict.fromkeys(map(str, dirs))
+        if not project_only or directory.startswith(root)
+    ]
+
+
+def template_names(engine, project_only=True):
+    names = set()
+    for directory in template_dirs(engine, project_only):
+        for path, _, files in os.walk(directory):
+            for filename in files:
+                if filename.endswith(('.html', '.txt')):
+                    names.add(os.path.relpath(
+                        os.path.join(path, filename), directory
+                    ).replace(os.sep, '/'))
+    return sorted(names)
+
+
+def referenced_names(template):
+    """Шаблоны из {% extends %} и {% include %} с постоянным именем."""
+    nodes = template.nodelist.get_nodes_by_type((ExtendsNode, IncludeNode))
+    for node in nodes:
+        expression = (
+            node.parent_name if isinstance(node, ExtendsNode)
+            else node.template
+        )
+        if isinstance(expression.var, str) and not expression.filters:
+            yield expression.var
+
+
+def compile_templates(engine, names):
+    """Загружает шаблоны и всё, на что они ссылаются. Возвращает
+    время загрузки каждого шаблона в миллисекундах."""
+    timings = {}
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name in timings:
+            continue
+        started = time.perf_counter()
+        template = engine.get_template(name)
+        timings[name] = (time.perf_counter() - started) * 1000
+        pending.extend(referenced_names(template))
+    return timings
+
+
+def uses_cached_loader():
+    return any(
+        isinstance(loader, CachedLoader)
+        for engine in django_engines()
+        for loader in engine.template_loaders
+    )
+
+
+def reset_templates():
+    """Очищает кэш загрузчика django.template.loaders.cached."""
+    for engine in django_engines():
+        for loader in engine.template_loaders:
+            loader.reset()
+
+
+def warm_up(project_only=True):
+    """Компилирует шаблоны проекта при старте процесса, чтобы первый
+    запрос не разбирал их сам. Имеет смысл с кэширующим загрузчиком,
+    ошибка в шаблоне останавливает запуск."""
+    started = time.perf_counter()
+    count = 0
+    for engine in django_engines():
+        count += len(compile_templates(
+            engine, template_names(engine, project_only)
+        ))
+    logger.info(
+        'Скомпилировано шаблонов: %d за %.1f мс',
+        count, (time.perf_counter() - started) * 1000,
+    )
+    return count
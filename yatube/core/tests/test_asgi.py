@@ -0,0 +1,154 @@
+import asyncio
+import threading
+
+from django.core.cache import cache
+from django.test import (
+    SimpleTestCase, TransactionTestCase, override_settings,
+)
+from django.urls import reverse
+
+from core.asgi import ASGIHandler, get_asgi_application
+from posts.models import Post, User
+
+
+def call(application, scope, body=b''):
+    """Выполняет ASGI-приложение, возвращает отправленные сообщения."""
+    messages = []
+    incoming = [{'type': 'http.request', 'body': body}]
+
+    async def receive():
+        return incoming.pop(0)
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(application(scope, receive, send))
+    return messages
+
+
+def http_scope(path, query_string=b''):
+    return {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'query_string': query_string,
+        'headers': [(b'host', b'testserver')],
+    }
+
+
+@override_settings(JOBS_EAGER=True)
+class ASGIHandlerTest(TransactionTestCase):
+    """Запросы выполняются в потоках пула, поэтому данные должны быть
+    зафиксированы, а не остаться в транзакции теста."""
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.application = get_asgi_application()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        cls.application.executor.shutdown()
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.user = User.objects.create_user(username='user')
+        self.post = Post.objects.create(author=self.user, text='Текст поста')
+
+    def test_feed_views(self):
+        """Ленты и страница поста отдаются через ASGI-точку входа."""
+        for path in (
+            reverse('posts:index'),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        ):
+            with self.subTest(path=path):
+                start, body = call(self.application, http_scope(path))
+                self.assertEqual(start['status'], 200)
+                self.assertIn(
+                    (b'content-type', b'text/html; charset=utf-8'),
+                    start['headers'],
+                )
+                self.assertIn('Текст поста', body['body'].decode())
+
+    def test_missing_page(self):
+        """Неизвестный адрес отдаёт 404."""
+        start, _ = call(self.application, http_scope('/missing/page/'))
+        self.assertEqual(start['status'], 404)
+
+    def test_query_string(self):
+        """Строка запроса доходит до view."""
+        _, body = call(self.application, http_scope(
+            reverse('posts:search'), 'q=поста'.encode()
+        ))
+        self.assertIn('Текст поста', body['body'].decode())
+
+
+class StreamingResponse:
+    """Потоковый ответ, запоминающий потоки, в которых его читали
+    и закрывали."""
+
+    streaming = True
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.threads = set()
+        self.closed = False
+
+    def __iter__(self):
+        for chunk in self.chunks:
+            self.threads.add(threading.get_ident())
+            yield chunk
+
+    def close(self):
+        self.threads.add(threading.get_ident())
+        self.closed = True
+
+
+class ASGIStreamingTest(SimpleTestCase):
+    def setUp(self) -> None:
+        self.response = StreamingResponse([b'a', b'b', b'c'] * 20)
+
+        def application(environ, start_response):
+            self.response.threads.add(threading.get_ident())
+            start_response('200 OK', [('Content-Type', 'text/csv')])
+            return self.response
+
+        self.application = ASGIHandler(application, 4)
+
+    def tearDown(self) -> None:
+        self.application.executor.shutdown()
+
+    def test_streaming_response_pinned_to_one_thread(self):
+        """Потоковый ответ создаётся, читается и закрывается в одном
+        потоке пула, все части доходят до клиента по порядку."""
+        messages = call(self.application, http_scope('/export/'))
+        self.assertEqual(messages[0]['status'], 200)
+        self.assertEqual(
+            b''.join(message.get('body', b'') for message in messages[1:]),
+            b'abc' * 20,
+        )
+        self.assertFalse(messages[-1].get('more_body'))
+        self.assertTrue(self.response.closed)
+        self.assertEqual(len(self.response.threads), 1)
+
+    def test_disconnected_client_closes_response(self):
+        """Ошибка отправки останавливает чтение ответа, и он всё равно
+        закрывается в своём потоке."""
+        sent = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            sent.append(message)
+            if len(sent) == 2:
+                raise OSError('Клиент отключился')
+
+        with self.assertRaises(OSError):
+            asyncio.run(
+                self.application(http_scope('/export/'), receive, send)
+            )
+        self.assertTrue(self.response.closed)
+        self.assertEqual(len(self.response.threads), 1)
@@ -0,0 +1,48 @@
+import json
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import AuthorStats, Group, Post, User
+
+
+class SeedAndBenchmarkCommandsTest(TestCase):
+    def test_seed_creates_rows_and_counters(self):
+        """Заполнение создаёт записи и пересчитывает счётчики авторов."""
+        call_command(
+            'seed_posts', users=3, groups=2, posts=25, stdout=StringIO()
+        )
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(Group.objects.count(), 2)
+        self.assertEqual(Post.objects.count(), 25)
+        self.assertEqual(
+            sum(AuthorStats.objects.values_list('posts_count', flat=True)),
+            25
+        )
+
+    def test_benchmark_writes_json_report(self):
+        """Замер обходит маршруты и сохраняет отчёт в JSON."""
+        call_command(
+            'seed_posts', users=2, groups=1, posts=15, stdout=StringIO()
+        )
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'report.json')
+            call_command(
+                'benchmark', iterations=2, json_path=path,
+                stdout=StringIO(), stderr=StringIO(),
+            )
+            with open(path) as report:
+                results = json.load(report)['results']
+        routes = {result['route'] for result in results}
+        self.assertIn('posts:index', routes)
+        self.assertIn('users:login', routes)
+        self.assertIn('about:tech', routes)
+        index = next(
+            result for result in results
+            if result['route'] == 'posts:index'
+        )
+        self.assertEqual(index['status'], 200)
+        self.assertGreater(index['bytes'], 0)
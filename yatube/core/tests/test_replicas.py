@@ -0,0 +1,91 @@
+import os
+import tempfile
+
+from django.core.cache import cache
+from django.db import connections
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.management.commands.sync_replica import sync_replica
+from posts.models import Post, User
+
+REPLICA = 'replica'
+INDEX_URL = reverse('posts:index')
+CREATE_URL = reverse('posts:post_create')
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRoutingTest(TransactionTestCase):
+    """Основная база - тестовая база default, реплика - отдельный
+    SQLite-файл, который тест обновляет командой sync_replica."""
+    databases = {'default', REPLICA}
+
+    @classmethod
+    def setUpClass(cls) -> None:
+        cls.directory = tempfile.TemporaryDirectory()
+        connections.databases[REPLICA] = {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.path.join(cls.directory.name, 'replica.sqlite3'),
+        }
+        sync_replica(REPLICA)
+        super().setUpClass()
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        super().tearDownClass()
+        connections[REPLICA].close()
+        del connections.databases[REPLICA]
+        delattr(connections._connections, REPLICA)
+        cls.directory.cleanup()
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.author = User.objects.create_user(username='author')
+        self.reader = User.objects.create_user(username='reader')
+        Post.objects.create(author=self.author, text='Старый пост')
+        sync_replica(REPLICA)
+        self.guest = Client()
+        self.author_client = Client()
+        self.author_client.force_login(self.author)
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def test_feeds_read_from_replica(self):
+        """Ленты и страница поста читают с реплики."""
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        self.assertNotContains(
+            self.reader_client.get(INDEX_URL), 'Новый пост'
+        )
+        self.assertContains(self.reader_client.get(INDEX_URL), 'Старый пост')
+        response = self.guest.get(
+            reverse('posts:post_detail', args=[post.pk])
+        )
+        self.assertEqual(response.status_code, 404)
+        sync_replica(REPLICA)
+        self.assertContains(self.reader_client.get(INDEX_URL), 'Новый пост')
+
+    def test_cached_pages_read_from_primary(self):
+        """Страница, которая попадёт в общий кэш, читается из основной
+        базы: отставшая реплика не остаётся в кэше после синхронизации."""
+        Post.objects.create(author=self.author, text='Новый пост')
+        self.assertContains(self.guest.get(INDEX_URL), 'Новый пост')
+        self.assertNotContains(
+            self.reader_client.get(INDEX_URL), 'Новый пост'
+        )
+
+    def test_write_pins_session_to_primary(self):
+        """После записи автор читает из основной базы, остальные -
+        с реплики."""
+        self.author_client.post(CREATE_URL, {'text': 'Новый пост'})
+        self.assertContains(self.author_client.get(INDEX_URL), 'Новый пост')
+        self.assertNotContains(
+            self.reader_client.get(INDEX_URL), 'Новый пост'
+        )
+
+    @override_settings(REPLICA_STICKY_SECONDS=0)
+    def test_pin_expires(self):
+        """По истечении окна сессия снова читает с реплики."""
+        self.author_client.post(CREATE_URL, {'text': 'Новый пост'})
+        self.assertNotContains(
+            self.author_client.get(INDEX_URL), 'Новый пост'
+        )
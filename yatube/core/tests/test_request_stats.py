@@ -0,0 +1,48 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post, User
+
+from .. import request_stats
+
+INDEX_URL = reverse('posts:index')
+STATS_URL = reverse('core:stats')
+
+
+class RequestStatsMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+        Post.objects.create(author=cls.user, text='Тестовый пост')
+
+    def setUp(self):
+        request_stats.reset()
+        self.another = Client()
+        self.another.force_login(self.user)
+        self.admin = Client()
+        self.admin.force_login(self.staff)
+
+    def test_server_timing_header(self):
+        """Ответ содержит время базы, шаблонов и всего запроса."""
+        timing = self.another.get(INDEX_URL)['Server-Timing']
+        self.assertIn('db;dur=', timing)
+        self.assertIn('tpl;dur=', timing)
+        self.assertIn('total;dur=', timing)
+
+    def test_stats_collected_per_view(self):
+        """Статистика копится по имени view и доступна персоналу."""
+        self.another.get(INDEX_URL)
+        self.another.get(INDEX_URL)
+        report = self.admin.get(STATS_URL).json()['views']
+        self.assertEqual(report['posts:index']['requests'], 2)
+        self.assertGreater(report['posts:index']['queries_total'], 0)
+        self.assertGreater(report['posts:index']['bytes_total'], 0)
+
+    def test_stats_staff_only(self):
+        """Обычный пользователь не видит статистику."""
+        self.assertRedirects(
+            self.another.get(STATS_URL),
+            f'{reverse("admin:login")}?next={STATS_URL}'
+        )
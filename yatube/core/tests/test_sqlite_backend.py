@@ -0,0 +1,52 @@
+import os
+import tempfile
+
+from django.db import connections, transaction
+from django.test import SimpleTestCase
+
+ALIAS = 'tuned'
+
+
+class TunedSQLiteBackendTest(SimpleTestCase):
+    def setUp(self) -> None:
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        connections.databases[ALIAS] = {
+            'ENGINE': 'core.backends.sqlite3',
+            'NAME': os.path.join(directory.name, 'db.sqlite3'),
+            'OPTIONS': {
+                'timeout': 3,
+                'transaction_mode': 'IMMEDIATE',
+                'pragmas': {'cache_size': -1024},
+            },
+        }
+        self.addCleanup(self.drop_alias)
+
+    def drop_alias(self):
+        connections[ALIAS].close()
+        del connections.databases[ALIAS]
+        delattr(connections._connections, ALIAS)
+
+    def pragma(self, name):
+        with connections[ALIAS].cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_pragmas_applied(self):
+        """Соединение открывается в режиме WAL с заданными pragma."""
+        self.assertEqual(self.pragma('journal_mode'), 'wal')
+        self.assertEqual(self.pragma('synchronous'), 1)
+        self.assertEqual(self.pragma('cache_size'), -1024)
+        self.assertEqual(self.pragma('busy_timeout'), 3000)
+
+    def test_transactions_take_write_lock(self):
+        """Транзакция сразу берёт блокировку записи."""
+        queries = []
+        connection = connections[ALIAS]
+        with connection.execute_wrapper(
+            lambda execute, sql, *args: queries.append(sql)
+            or execute(sql, *args)
+        ):
+            with transaction.atomic(using=ALIAS):
+                pass
+        self.assertEqual(queries[0], 'BEGIN IMMEDIATE')
@@ -0,0 +1,81 @@
+import gzip
+import shutil
+import tempfile
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.utils.http import http_date
+
+STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+STATIC_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    STATIC_ROOT=STATIC_ROOT, STATICFILES_STORAGE=STORAGE, STATIC_SERVE=True
+)
+class StaticFilesTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        call_command(
+            'collectstatic', interactive=False, verbosity=0,
+            ignore_patterns=['admin'],
+        )
+        cls.name = 'img/fav/favicon.ico'
+        cls.url = staticfiles_storage.url(cls.name)
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(STATIC_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.client = Client()
+
+    def test_hashed_name_cached_forever(self):
+        """Файл с хешем в имени отдаётся с заголовком immutable."""
+        self.assertNotEqual(self.url, f'/static/{self.name}')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith('image/'))
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertNotIn('Content-Encoding', response)
+
+    def test_gzip_negotiation(self):
+        """Клиент, принимающий gzip, получает сжатую копию."""
+        with staticfiles_storage.open(self.name) as source:
+            content = source.read()
+        response = self.client.get(
+            self.url, HTTP_ACCEPT_ENCODING='br;q=0, gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        body = b''.join(response.streaming_content)
+        self.assertLess(len(body), len(content))
+        self.assertEqual(gzip.decompress(body), content)
+
+    def test_unhashed_name_revalidated(self):
+        """Исходное имя кэшируется ненадолго и отвечает 304
+        на If-Modified-Since."""
+        response = self.client.get(f'/static/{self.name}')
+        self.assertEqual(response['Cache-Control'], 'public, max-age=60')
+        response = self.client.get(
+            f'/static/{self.name}',
+            HTTP_IF_MODIFIED_SINCE=response['Last-Modified'],
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_pages_link_hashed_names(self):
+        """Страницы ссылаются на статику с хешем в имени, а ссылка на
+        отсутствующий файл не ломает страницу."""
+        with self.assertLogs('core.staticfiles', 'WARNING'):
+            response = self.client.get('/about/tech/')
+        self.assertContains(response, self.url)
+
+    def test_unknown_file_passed_through(self):
+        """Неизвестный путь обрабатывается Django как обычно."""
+        response = self.client.get(
+            '/static/missing.css', HTTP_IF_MODIFIED_SINCE=http_date()
+        )
+        self.assertEqual(response.status_code, 404)
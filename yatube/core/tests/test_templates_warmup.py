@@ -0,0 +1,51 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from core.templates_warmup import (django_engines, referenced_names,
+                                   template_names, uses_cached_loader,
+                                   warm_up)
+from yatube import settings_prod
+
+
+@override_settings(TEMPLATES=settings_prod.TEMPLATES)
+class TemplateWarmupTest(TestCase):
+    def test_prod_profile_uses_cached_loader(self):
+        """В settings_prod шаблоны загружаются кэширующим загрузчиком."""
+        self.assertTrue(uses_cached_loader())
+
+    def test_warm_up_compiles_project_templates(self):
+        """Прогрев компилирует все шаблоны проекта и кладёт их в кэш."""
+        engine = django_engines()[0]
+        names = template_names(engine)
+        self.assertIn('posts/includes/post_card.html', names)
+        self.assertNotIn('admin/base.html', names)
+        with self.assertLogs('core.templates_warmup', 'INFO'):
+            self.assertEqual(warm_up(), len(names))
+        cache = engine.template_loaders[0].get_template_cache
+        self.assertTrue(set(names) <= set(cache))
+
+    def test_referenced_names(self):
+        """Из шаблона извлекаются только постоянные имена extends
+        и include."""
+        template = django_engines()[0].from_string(
+            "{% extends 'base.html' %}{% block content %}"
+            "{% include 'includes/footer.html' %}"
+            "{% include name %}{% endblock %}"
+        )
+        self.assertEqual(
+            sorted(referenced_names(template)),
+            ['base.html', 'includes/footer.html'],
+        )
+
+    def test_template_benchmark(self):
+        """Замер выводит время компиляции шаблонов и отрисовки страниц."""
+        call_command(
+            'seed_posts', users=2, groups=1, posts=15, stdout=StringIO()
+        )
+        output = StringIO()
+        call_command('template_benchmark', iterations=1, stdout=output)
+        self.assertIn('кэширующий', output.getvalue())
+        self.assertIn('posts/index.html', output.getvalue())
+        self.assertIn('posts:index', output.getvalue())
@@ -0,0 +1,17 @@
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
+
+from posts.cache import post_card_stats
+
+from . import request_stats
+
+
+@staff_member_required
+def stats(request):
+    """Статистика запросов по view и кэша карточек постов."""
+    if request.method == 'POST':
+        request_stats.reset()
+    return JsonResponse({
+        'views': request_stats.snapshot(),
+        'post_cards': post_card_stats(),
+    }, json_dumps_params={'ensure_ascii': False})
@@ -0,0 +1,36 @@
+import json
+
+from django.contrib import admin
+
+from .models import Job
+
+MAIL_TASK = 'jobs.send_emails'
+# Поля письма, которые видны в админке. Тело, альтернативы
+# и вложения скрыты: в письме сброса пароля лежит ссылка с токеном.
+MAIL_VISIBLE_FIELDS = ('subject', 'from_email', 'to', 'cc', 'bcc')
+
+
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'status', 'attempts', 'run_at', 'created')
+    list_filter = ('status', 'name')
+    # Задачу нельзя подменить из админки: исполнитель выполняет
+    # её имя с её аргументами. Аргументы показываются через
+    # arguments, чтобы скрыть содержимое писем.
+    exclude = ('payload',)
+    readonly_fields = (
+        'name', 'arguments', 'locked_by', 'locked_at', 'last_error'
+    )
+    empty_value_display = '-пусто-'
+
+    def arguments(self, job):
+        kwargs = job.kwargs
+        if job.name == MAIL_TASK:
+            message = kwargs.get('message', {})
+            kwargs = {'message': {
+                field: message.get(field) for field in MAIL_VISIBLE_FIELDS
+            }}
+        return json.dumps(kwargs, ensure_ascii=False, sort_keys=True)
+    arguments.short_description = 'Аргументы'
+
+
+admin.site.register(Job, JobAdmin)
@@ -0,0 +1,87 @@
+import base64
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.core.mail.backends.base import BaseEmailBackend
+
+from .queue import PartialFailure, enqueue
+
+MESSAGE_FIELDS = (
+    'subject', 'body', 'from_email', 'to', 'cc', 'bcc', 'reply_to',
+    'content_subtype',
+)
+
+
+def dump_message(message):
+    """Письмо в виде JSON-совместимого словаря. Вложения хранятся
+    текстом или в base64, объекты MIMEBase не поддерживаются."""
+    data = {field: getattr(message, field) for field in MESSAGE_FIELDS}
+    data['headers'] = dict(message.extra_headers)
+    data['alternatives'] = [
+        list(alternative)
+        for alternative in getattr(message, 'alternatives', ())
+    ]
+    data['attachments'] = []
+    for attachment in message.attachments:
+        if not isinstance(attachment, tuple):
+            raise TypeError('Вложения MIMEBase нельзя поставить в очередь')
+        filename, content, mimetype = attachment
+        if isinstance(content, str):
+            data['attachments'].append({
+                'filename': filename, 'content': content,
+                'mimetype': mimetype,
+            })
+        else:
+            data['attachments'].append({
+                'filename': filename, 'mimetype': mimetype,
+                'data': base64.b64encode(content).decode(),
+            })
+    return data
+
+
+def load_message(data):
+    message = EmailMultiAlternatives(
+        **{field: data[field] for field in MESSAGE_FIELDS[:-1]},
+        headers=data['headers'],
+        alternatives=[tuple(item) for item in data['alternatives']],
+    )
+    message.content_subtype = data['content_subtype']
+    for attachment in data['attachments']:
+        content = attachment.get('content')
+        if content is None:
+            content = base64.b64decode(attachment['data'])
+        message.attach(
+            attachment['filename'], content, attachment['mimetype']
+        )
+    return message
+
+
+class QueuedEmailBackend(BaseEmailBackend):
+    """Сохраняет письма в очередь задач вместо отправки.
+
+    Письма отправляет исполнитель run_jobs пачками через одно
+    соединение бэкенда EMAIL_DELIVERY_BACKEND, поэтому время ответа
+    view не зависит от скорости почтового сервера.
+    """
+
+    def send_messages(self, email_messages):
+        for message in email_messages:
+            enqueue('jobs.send_emails', message=dump_message(message))
+        return len(email_messages)
+
+
+def deliver(messages):
+    """Отправляет письма через одно соединение. Неотправленные
+    письма сообщаются исключением PartialFailure."""
+    connection = get_connection(settings.EMAIL_DELIVERY_BACKEND)
+    failed = []
+    error = ''
+    with connection:
+        for index, message in enumerate(messages):
+            try:
+                connection.send_messages([message])
+            except Exception as exception:
+                failed.append(index)
+                error = repr(exception)
+    if failed:
+        raise PartialFailure(failed, error)
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand
+
+from jobs.worker import Worker
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=4,
+            help='Число потоков исполнителя',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Число задач, захватываемых за один проход',
+        )
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза между опросами пустой очереди, секунды',
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выйти, когда очередь опустеет',
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(
+            threads=options['threads'], batch_size=options['batch_size']
+        )
+        self.stdout.write(f'Исполнитель {worker.worker_id} запущен')
+        try:
+            total = worker.run(
+                poll_interval=options['poll_interval'], once=options['once']
+            )
+        except KeyboardInterrupt:
+            return
+        self.stdout.write(self.style.SUCCESS(
+            f'Выполнено задач: {total}'
+        ))
@@ -0,0 +1,69 @@
+import json
+
+from django.db import models
+from django.utils import timezone
+
+
+class Job(models.Model):
+    """Модель фоновой задачи:
+    имя задачи - name (зарегистрированное через jobs.queue.task);
+    аргументы - payload (JSON);
+    состояние - status;
+    число попыток - attempts, предел - max_attempts;
+    время ближайшего запуска - run_at;
+    исполнитель и время захвата - locked_by, locked_at;
+    последняя ошибка - last_error
+    """
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (QUEUED, 'В очереди'),
+        (RUNNING, 'Выполняется'),
+        (FAILED, 'Ошибка'),
+    )
+
+    name = models.CharField(max_length=200, verbose_name="Задача")
+    payload = models.TextField(default='{}', verbose_name="Аргументы")
+    status = models.CharField(
+        max_length=10,
+        choices=STATUSES,
+        default=QUEUED,
+        verbose_name="Состояние",
+    )
+    attempts = models.PositiveIntegerField(
+        default=0, verbose_name="Попыток"
+    )
+    max_attempts = models.PositiveIntegerField(
+        default=5, verbose_name="Предел попыток"
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now, verbose_name="Время запуска"
+    )
+    created = models.DateTimeField(
+        auto_now_add=True, verbose_name="Дата создания"
+    )
+    locked_by = models.CharField(
+        max_length=100, blank=True, verbose_name="Исполнитель"
+    )
+    locked_at = models.DateTimeField(
+        null=True, blank=True, verbose_name="Время захвата"
+    )
+    last_error = models.TextField(blank=True, verbose_name="Ошибка")
+
+    class Meta:
+        ordering = ('run_at', 'pk')
+        indexes = (
+            models.Index(
+                fields=('status', 'run_at'), name='job_status_run_at_idx'
+            ),
+        )
+        verbose_name = 'задача'
+        verbose_name_plural = 'задачи'
+
+    def __str__(self) -> str:
+        return f'{self.name} #{self.pk}'
+
+    @property
+    def kwargs(self):
+        return json.loads(self.payload)
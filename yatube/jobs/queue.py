@@ -0,0 +1,56 @@
+import json
+from collections import namedtuple
+
+from django.conf import settings
+
+from .models import Job
+
+Task = namedtuple('Task', 'func batch')
+
+TASKS = {}
+
+
+class PartialFailure(Exception):
+    """Пакетная задача выполнена не целиком: indexes - номера
+    неудавшихся записей, только они вернутся в очередь."""
+
+    def __init__(self, indexes, error):
+        super().__init__(error)
+        self.indexes = indexes
+        self.error = error
+
+
+def task(name, batch=False):
+    """Регистрирует функцию как фоновую задачу.
+
+    Обычная задача вызывается с аргументами одной записи очереди.
+    Пакетная (batch=True) получает список аргументов всех записей
+    с этим именем, захваченных исполнителем за один проход.
+    """
+    def decorator(func):
+        TASKS[name] = Task(func, batch)
+        return func
+    return decorator
+
+
+def enqueue(name, max_attempts=None, **kwargs):
+    """Ставит задачу в очередь. При JOBS_EAGER выполняет сразу."""
+    if name not in TASKS:
+        raise LookupError(f'Неизвестная задача: {name}')
+    if settings.JOBS_EAGER:
+        call(name, [kwargs])
+        return None
+    return Job.objects.create(
+        name=name,
+        payload=json.dumps(kwargs, sort_keys=True),
+        max_attempts=max_attempts or settings.JOBS_MAX_ATTEMPTS,
+    )
+
+
+def call(name, payloads):
+    task = TASKS[name]
+    if task.batch:
+        task.func(payloads)
+        return
+    for kwargs in payloads:
+        task.func(**kwargs)
@@ -0,0 +1,7 @@
+from .mail import deliver, load_message
+from .queue import task
+
+
+@task('jobs.send_emails', batch=True)
+def send_emails(payloads):
+    deliver([load_message(kwargs['message']) for kwargs in payloads])
@@ -0,0 +1,72 @@
+import socketserver
+import threading
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """Минимальный SMTP-сервер: принимает письма и складывает их
+    в server.messages как (отправитель, получатели, текст)."""
+
+    def reply(self, line):
+        self.wfile.write(f'{line}\r\n'.encode())
+
+    def handle(self):
+        self.server.connections += 1
+        self.sender, self.recipients = None, []
+        self.reply('220 localhost SMTP sink')
+        while True:
+            line = self.rfile.readline().decode().rstrip('\r\n')
+            if not line:
+                return
+            command = getattr(self, f'smtp_{line[:4].lower()}', None)
+            if command is None:
+                self.reply('250 OK')
+            elif command(line) is False:
+                return
+
+    def smtp_mail(self, line):
+        self.sender = line.split(':', 1)[1].strip()
+        self.recipients = []
+        self.reply('250 OK')
+
+    def smtp_rcpt(self, line):
+        self.recipients.append(line.split(':', 1)[1].strip())
+        self.reply('250 OK')
+
+    def smtp_data(self, line):
+        self.reply('354 End data with <CR><LF>.<CR><LF>')
+        data = []
+        for raw in self.rfile:
+            raw = raw.decode().rstrip('\r\n')
+            if raw == '.':
+                break
+            data.append(raw)
+        self.server.messages.append(
+            (self.sender, self.recipients, '\n'.join(data))
+        )
+        self.reply('250 OK')
+
+    def smtp_quit(self, line):
+        self.reply('221 Bye')
+        return False
+
+
+class SMTPSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), SMTPHandler)
+        self.messages = []
+        self.connections = 0
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *args):
+        self.shutdown()
+        self.server_close()
@@ -0,0 +1,106 @@
+import json
+
+from django.core import mail
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import User
+
+from ..mail import dump_message, load_message
+from ..models import Job
+from ..worker import Worker
+from .smtp import SMTPSink
+
+SMTP_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
+
+
+@override_settings(
+    EMAIL_BACKEND='jobs.mail.QueuedEmailBackend',
+    EMAIL_DELIVERY_BACKEND=SMTP_BACKEND,
+    EMAIL_HOST='127.0.0.1',
+    JOBS_EAGER=False,
+)
+class QueuedEmailTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='user', email='user@example.com', password='password'
+        )
+
+    def test_password_reset_is_queued_and_sent_in_batch(self):
+        """Сброс пароля только ставит письмо в очередь, исполнитель
+        отправляет пачку писем через одно соединение."""
+        client = Client()
+        for _ in range(3):
+            response = client.post(
+                reverse('users:password_reset_form'),
+                {'email': 'user@example.com'},
+            )
+            self.assertEqual(response.status_code, 302)
+        self.assertEqual(Job.objects.count(), 3)
+        with SMTPSink() as sink:
+            with self.settings(EMAIL_PORT=sink.port):
+                Worker(threads=1).run(once=True)
+        self.assertEqual(sink.connections, 1)
+        self.assertEqual(len(sink.messages), 3)
+        sender, recipients, _ = sink.messages[0]
+        self.assertEqual(recipients, ['<user@example.com>'])
+        self.assertFalse(Job.objects.exists())
+
+    def test_unreachable_server_keeps_messages_queued(self):
+        """Недоступный сервер не теряет письма: они остаются
+        в очереди для повтора."""
+        mail.send_mail('Тема', 'Текст', 'from@example.com', ['to@x.com'])
+        with SMTPSink() as sink:
+            port = sink.port
+        with self.settings(EMAIL_PORT=port, EMAIL_TIMEOUT=1):
+            with self.assertLogs('jobs.worker', 'ERROR'):
+                Worker(threads=1).run_once()
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertTrue(job.last_error)
+
+    def test_admin_hides_mail_body(self):
+        """Админка показывает тему и получателей письма в очереди,
+        но не ссылку сброса пароля из его текста."""
+        Client().post(
+            reverse('users:password_reset_form'),
+            {'email': 'user@example.com'},
+        )
+        job = Job.objects.get()
+        body = job.kwargs['message']['body']
+        link = next(line for line in body.splitlines() if '/reset/' in line)
+        admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        )
+        client = Client()
+        client.force_login(admin)
+        response = client.get(
+            reverse('admin:jobs_job_change', args=[job.pk])
+        )
+        self.assertContains(response, 'user@example.com')
+        self.assertNotContains(response, link.strip())
+        self.assertNotContains(response, 'name="payload"')
+
+
+class MessageSerializationTest(TestCase):
+    def test_message_round_trip_through_json(self):
+        """Письмо сохраняется в очереди как JSON и восстанавливается
+        с альтернативами, заголовками и вложениями."""
+        message = mail.EmailMultiAlternatives(
+            'Тема', 'Текст', 'from@example.com', ['to@example.com'],
+            bcc=['bcc@example.com'], headers={'X-Tag': 'test'},
+        )
+        message.attach_alternative('<p>Текст</p>', 'text/html')
+        message.attach('a.txt', 'вложение', 'text/plain')
+        message.attach('b.bin', b'\x00\x01', 'application/octet-stream')
+        data = json.loads(json.dumps(dump_message(message)))
+        restored = load_message(data)
+        self.assertEqual(restored.recipients(), message.recipients())
+        self.assertEqual(restored.alternatives, message.alternatives)
+        self.assertEqual(restored.attachments, message.attachments)
+        self.assertEqual(restored.extra_headers, {'X-Tag': 'test'})
+        self.assertEqual(
+            restored.message()['Subject'], message.message()['Subject']
+        )
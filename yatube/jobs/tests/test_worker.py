@@ -0,0 +1,93 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts import search
+from posts.models import Post, User
+
+from ..models import Job
+from ..queue import enqueue, task
+from ..worker import Worker
+
+calls = []
+
+
+@task('tests.record', batch=True)
+def record(payloads):
+    calls.append(sorted(kwargs['value'] for kwargs in payloads))
+
+
+@task('tests.fail')
+def fail():
+    raise RuntimeError('сбой')
+
+
+@override_settings(JOBS_EAGER=False)
+class WorkerTest(TestCase):
+    def setUp(self) -> None:
+        calls.clear()
+        self.worker = Worker(threads=1)
+
+    def test_batch_task_runs_once_per_pass(self):
+        """Пакетная задача получает все захваченные записи разом,
+        выполненные записи удаляются."""
+        for value in (3, 1, 2):
+            enqueue('tests.record', value=value)
+        self.assertEqual(self.worker.run(once=True), 3)
+        self.assertEqual(calls, [[1, 2, 3]])
+        self.assertFalse(Job.objects.exists())
+
+    def test_failed_task_is_retried_then_failed(self):
+        """Упавшая задача откладывается, после последней попытки
+        помечается ошибкой."""
+        job = enqueue('tests.fail', max_attempts=2)
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            self.worker.run_once()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertEqual(job.attempts, 1)
+        self.assertGreater(job.run_at, timezone.now())
+        self.assertIn('RuntimeError', job.last_error)
+        self.assertEqual(self.worker.run_once(), 0)
+        Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+        with self.assertLogs('jobs.worker', 'ERROR'):
+            self.worker.run_once()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(job.attempts, 2)
+
+    def test_stale_lock_is_reclaimed(self):
+        """Задачу упавшего исполнителя забирает другой."""
+        enqueue('tests.record', value=1)
+        Job.objects.update(
+            status=Job.RUNNING,
+            locked_by='gone',
+            locked_at=timezone.now() - timedelta(days=1),
+        )
+        self.assertEqual(self.worker.run_once(), 1)
+        self.assertEqual(calls, [[1]])
+
+    def test_unknown_task(self):
+        with self.assertRaises(LookupError):
+            enqueue('tests.missing')
+
+    def test_post_create_enqueues_side_effects(self):
+        """Создание поста ставит индексацию и ленты в очередь,
+        они выполняются исполнителем."""
+        cache.clear()
+        user = User.objects.create_user(username='user')
+        client = Client()
+        client.force_login(user)
+        client.post(reverse('posts:post_create'), {'text': 'Фоновая задача'})
+        self.assertEqual(
+            set(Job.objects.values_list('name', flat=True)),
+            {'posts.reindex_posts', 'posts.fan_out_posts'},
+        )
+        self.assertEqual(search.search('фоновая'), [])
+        self.worker.run(once=True)
+        post = Post.objects.get()
+        self.assertEqual(search.search('фоновая'), [post.pk])
+        self.assertTrue(user.timeline.filter(post=post).exists())
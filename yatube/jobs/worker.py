@@ -0,0 +1,145 @@
+import logging
+import os
+import socket
+import time
+import traceback
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, wait
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import F, Q
+from django.utils import timezone
+
+from .models import Job
+from .queue import TASKS, PartialFailure, call
+
+logger = logging.getLogger(__name__)
+
+
+class Worker:
+    """Исполнитель очереди задач.
+
+    За проход захватывает до batch_size готовых задач одним UPDATE,
+    поэтому несколько исполнителей не возьмут одну задачу дважды.
+    Пакетные задачи одного имени выполняются одним вызовом, остальные
+    по одной, в пуле из threads потоков. При threads=1 задачи
+    выполняются в текущем потоке. Успешные задачи удаляются, упавшие
+    возвращаются в очередь с экспоненциальной задержкой до исчерпания
+    попыток.
+    """
+
+    def __init__(self, threads=4, batch_size=100):
+        self.threads = threads
+        self.batch_size = batch_size
+        self.worker_id = (
+            f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}'
+        )
+
+    def ready(self, now):
+        stale = now - timedelta(seconds=settings.JOBS_LOCK_TIMEOUT)
+        return (
+            Q(status=Job.QUEUED, run_at__lte=now)
+            | Q(status=Job.RUNNING, locked_at__lt=stale)
+        )
+
+    def claim(self):
+        now = timezone.now()
+        ids = list(Job.objects.filter(self.ready(now)).order_by(
+            'run_at', 'pk'
+        ).values_list('pk', flat=True)[:self.batch_size])
+        if not ids:
+            return []
+        Job.objects.filter(self.ready(now), pk__in=ids).update(
+            status=Job.RUNNING,
+            locked_by=self.worker_id,
+            locked_at=now,
+            attempts=F('attempts') + 1,
+        )
+        return list(Job.objects.filter(
+            pk__in=ids, locked_by=self.worker_id, locked_at=now
+        ))
+
+    def units(self, jobs):
+        """Группы задач, каждая выполняется одним вызовом."""
+        batches = defaultdict(list)
+        for job in jobs:
+            task = TASKS.get(job.name)
+            if task is not None and task.batch:
+                batches[job.name].append(job)
+            else:
+                yield job.name, [job]
+        yield from batches.items()
+
+    def run_once(self):
+        """Выполняет один проход, возвращает число захваченных задач."""
+        jobs = self.claim()
+        units = list(self.units(jobs))
+        if self.threads <= 1:
+            for name, unit in units:
+                self.execute(name, unit)
+        elif units:
+            with ThreadPoolExecutor(self.threads) as executor:
+                wait([
+                    executor.submit(self.execute_in_thread, name, unit)
+                    for name, unit in units
+                ])
+        return len(jobs)
+
+    def execute_in_thread(self, name, jobs):
+        try:
+            self.execute(name, jobs)
+        finally:
+            connection.close()
+
+    def execute(self, name, jobs):
+        try:
+            if name not in TASKS:
+                raise LookupError(f'Неизвестная задача: {name}')
+            call(name, [job.kwargs for job in jobs])
+        except PartialFailure as failure:
+            failed = [jobs[index] for index in failure.indexes]
+            logger.error('Задача %s выполнена частично', name)
+            for job in failed:
+                self.fail(job, failure.error)
+            Job.objects.filter(
+                pk__in=[job.pk for job in jobs if job not in failed]
+            ).delete()
+        except Exception:
+            error = traceback.format_exc()
+            logger.exception('Задача %s не выполнена', name)
+            for job in jobs:
+                self.fail(job, error)
+        else:
+            Job.objects.filter(pk__in=[job.pk for job in jobs]).delete()
+
+    def fail(self, job, error):
+        if job.attempts >= job.max_attempts:
+            status, run_at = Job.FAILED, job.run_at
+        else:
+            status = Job.QUEUED
+            run_at = timezone.now() + timedelta(
+                seconds=settings.JOBS_RETRY_DELAY * 2 ** (job.attempts - 1)
+            )
+        Job.objects.filter(pk=job.pk).update(
+            status=status,
+            run_at=run_at,
+            locked_by='',
+            locked_at=None,
+            last_error=error,
+        )
+
+    def run(self, poll_interval=1.0, once=False):
+        """Выполняет задачи, пока очередь не опустеет (once) или
+        до прерывания."""
+        total = 0
+        while True:
+            claimed = self.run_once()
+            total += claimed
+            if claimed:
+                continue
+            if once:
+                return total
+            time.sleep(poll_interval)
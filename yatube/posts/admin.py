@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import Post, Group
+from . import search
+from .models import Follow, Post, Group
 
 
 class PostAdmin(admin.ModelAdmin):
@@ -10,6 +11,16 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = ('group',)
     empty_value_display = '-пусто-'
 
+    def get_search_results(self, request, queryset, search_term):
+        """Поиск по тексту идёт через поисковый индекс, а не LIKE:
+        подзапрос без ограничения SEARCH_RESULTS_LIMIT."""
+        if not search_term:
+            return queryset, False
+        return queryset.filter(
+            pk__in=search.matching_posts(search_term)
+        ), False
+
 
 admin.site.register(Post, PostAdmin)
 admin.site.register(Group)
+admin.site.register(Follow)
@@ -0,0 +1,168 @@
+import hashlib
+import time
+from collections import Counter
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import HttpResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.translation import get_language
+
+from core.db_routers import read_primary
+
+POST_CARD_VARIANTS = ('index', 'group', 'profile')
+LOCAL_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+post_card_counters = Counter()
+
+
+def cache_is_shared():
+    """Общий ли кэш для всех процессов: у LocMemCache он свой в каждом
+    процессе, и инвалидация в одном процессе не видна в других."""
+    return settings.CACHES['default']['BACKEND'] != LOCAL_CACHE_BACKEND
+
+
+def make_key(prefix, *parts):
+    """Ключ кэша с хешем переменной части: slug, username, путь
+    и параметры запроса могут содержать пробелы, не-ASCII символы
+    и быть длиннее допустимого memcached ключа."""
+    raw = '|'.join(str(part) for part in parts)
+    return f'{prefix}:{hashlib.md5(raw.encode()).hexdigest()}'
+
+
+def post_card_key(variant, post_id, version):
+    return make_key('post-card', get_language(), variant, post_id, version)
+
+
+def post_card_version(post):
+    return post.updated.timestamp()
+
+
+def get_post_card(post, variant, render):
+    """Возвращает HTML карточки поста из кэша или рендерит его."""
+    key = post_card_key(variant, post.pk, post_card_version(post))
+    html = cache.get(key)
+    if html is not None:
+        post_card_counters['hits'] += 1
+        return html
+    post_card_counters['misses'] += 1
+    html = render()
+    cache.set(key, html, settings.POST_CARD_CACHE_TIMEOUT)
+    return html
+
+
+def invalidate_post_cards(posts):
+    """Удаляет карточки постов, posts - пары (id, updated)."""
+    keys = []
+    for post_id, updated in posts:
+        version = updated.timestamp()
+        keys.extend(
+            post_card_key(variant, post_id, version)
+            for variant in POST_CARD_VARIANTS
+        )
+        if len(keys) >= 1000:
+            cache.delete_many(keys)
+            keys = []
+    if keys:
+        cache.delete_many(keys)
+
+
+def post_card_stats():
+    """Счётчики попаданий и промахов кэша карточек постов."""
+    hits = post_card_counters['hits']
+    misses = post_card_counters['misses']
+    total = hits + misses
+    return {
+        'hits': hits,
+        'misses': misses,
+        'hit_ratio': hits / total if total else 0.0,
+    }
+
+
+def feed_version(feed):
+    """Поколение ленты - время её последней инвалидации в наносекундах.
+    Вытесненный из кэша счётчик начинается с нового значения,
+    поэтому старые страницы ленты не воскресают."""
+    key = make_key('feed-version', feed)
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_feeds(*feeds):
+    version = time.time_ns()
+    cache.set_many(
+        {make_key('feed-version', feed): version for feed in feeds}, None
+    )
+
+
+def feed_changed(version):
+    """Время инвалидации поколения ленты. Ленты меняются не только
+    с правкой постов, но и при переименовании авторов и групп."""
+    return datetime.fromtimestamp(version / 10 ** 9, timezone.utc)
+
+
+def feed_state(feed, posts, count=True):
+    """Дата последнего изменения и число постов ленты. Считаются
+    одним агрегирующим запросом раз на поколение ленты: любое
+    изменение ленты сбрасывает поколение. Без count число постов
+    не считается (ленте по курсору оно не нужно)."""
+    version = feed_version(feed)
+    key = make_key('feed-state', feed, version, count)
+    state = cache.get(key)
+    if state is None:
+        aggregates = {'last': Max('updated')}
+        if count:
+            aggregates['total'] = Count('pk')
+        with read_primary():
+            state = posts.order_by().aggregate(**aggregates)
+        cache.set(key, state, settings.FEED_PAGE_CACHE_TIMEOUT)
+    return version, state
+
+
+def anonymous_page_cache(feed):
+    """Кэширует страницу ленты для неавторизованных пользователей.
+
+    feed - шаблон имени ленты, подставляются аргументы view,
+    например 'group:{slug}'. Ключ страницы учитывает путь,
+    номер страницы и курсор.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (
+                request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated
+            ):
+                return view(request, *args, **kwargs)
+            name = feed.format(**kwargs)
+            key = make_key(
+                'feed-page',
+                name,
+                feed_version(name),
+                request.path,
+                request.GET.get('page', ''),
+                request.GET.get('cursor', ''),
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                content, content_type = cached
+                response = HttpResponse(content, content_type=content_type)
+            else:
+                with read_primary():
+                    response = view(request, *args, **kwargs)
+                if response.status_code == 200 and not response.streaming:
+                    cache.set(
+                        key,
+                        (response.content, response['Content-Type']),
+                        settings.FEED_PAGE_CACHE_TIMEOUT,
+                    )
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,96 @@
+import hashlib
+
+from django.conf import settings
+from django.http import Http404
+from django.views.decorators.http import condition
+
+from .cache import feed_changed, feed_state
+from .groups import get_group_or_404
+from .models import Follow, Post
+
+
+def make_etag(request, *parts):
+    """ETag учитывает пользователя и строку запроса: страницы
+    отличаются для авторизованных и по номеру страницы."""
+    raw = '|'.join(
+        str(part) for part in (
+            request.user.pk, request.GET.urlencode(), *parts
+        )
+    )
+    return hashlib.md5(raw.encode()).hexdigest()
+
+
+def last_modified(request, stamp):
+    """Last-Modified только для анонимных страниц: у авторизованных
+    содержимое зависит и от данных пользователя."""
+    return None if request.user.is_authenticated else stamp
+
+
+def feed_validators(request, feed, posts, *parts):
+    """Поколение ленты входит в ETag и Last-Modified: переименование
+    автора или группы меняет страницу, не меняя даты постов."""
+    version, state = feed_state(
+        feed, posts, count=settings.FEED_PAGINATION != 'cursor'
+    )
+    changed = feed_changed(version)
+    return (
+        make_etag(
+            request, feed, version, state['last'], state.get('total'),
+            *parts
+        ),
+        last_modified(request, max(state['last'] or changed, changed)),
+    )
+
+
+def index_validators(request):
+    return feed_validators(request, 'index', Post.objects.all())
+
+
+def group_validators(request, slug):
+    try:
+        group = get_group_or_404(slug)
+    except Http404:
+        return None, None
+    return feed_validators(request, f'group:{slug}', group.posts.all())
+
+
+def profile_validators(request, username):
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author__username=username
+    ).exists()
+    return feed_validators(
+        request, f'profile:{username}',
+        Post.objects.filter(author__username=username), following,
+    )
+
+
+def post_validators(request, post_id):
+    state = Post.objects.filter(pk=post_id).values_list(
+        'updated', 'author__username', 'author__first_name',
+        'author__last_name', 'author__stats__posts_count',
+        'group__slug', 'group__title',
+    ).first()
+    if state is None:
+        return None, None
+    return make_etag(request, *state), last_modified(request, state[0])
+
+
+def conditional_page(validators):
+    """Conditional GET для страниц постов: validators(request, **kwargs)
+    возвращает пару (ETag, Last-Modified) без отрисовки страницы и
+    считается один раз на запрос."""
+    def decorator(view):
+        def get_validators(request, **kwargs):
+            if not hasattr(request, '_page_validators'):
+                request._page_validators = validators(request, **kwargs)
+            return request._page_validators
+
+        return condition(
+            etag_func=lambda request, **kwargs: get_validators(
+                request, **kwargs
+            )[0],
+            last_modified_func=lambda request, **kwargs: get_validators(
+                request, **kwargs
+            )[1],
+        )(view)
+    return decorator
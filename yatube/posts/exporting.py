@@ -0,0 +1,90 @@
+import csv
+import io
+import json
+import zlib
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from .models import Post
+
+FIELDS = ('id', 'text', 'pub_date', 'author', 'group')
+GZIP_BUFFER_SIZE = 64 * 1024
+
+
+def parse_period(value):
+    """Граница периода выгрузки в ISO 8601 или None. Неверное
+    значение - ValueError: его нужно отклонить до начала выгрузки."""
+    if not value:
+        return None
+    try:
+        moment = parse_datetime(value)
+    except ValueError:
+        moment = None
+    if moment is None:
+        raise ValueError(f'Неверная дата {value!r}, ожидается ISO 8601')
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def export_rows(author=None, group=None, since=None, until=None,
+                chunk_size=2000):
+    """Посты в виде словарей, читаются порциями через iterator().
+    since и until - datetime из parse_period."""
+    posts = Post.objects.order_by('pk')
+    if author:
+        posts = posts.filter(author__username=author)
+    if group:
+        posts = posts.filter(group__slug=group)
+    if since:
+        posts = posts.filter(pub_date__gte=since)
+    if until:
+        posts = posts.filter(pub_date__lt=until)
+    for values in posts.values_list(
+        'pk', 'text', 'pub_date', 'author__username', 'group__slug'
+    ).iterator(chunk_size=chunk_size):
+        row = dict(zip(FIELDS, values))
+        row['pub_date'] = row['pub_date'].isoformat()
+        yield row
+
+
+def jsonl_lines(rows):
+    for row in rows:
+        yield json.dumps(row, ensure_ascii=False) + '\n'
+
+
+def csv_lines(rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, FIELDS)
+    writer.writeheader()
+    for row in rows:
+        writer.writerow(row)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+
+ENCODERS = {'jsonl': jsonl_lines, 'csv': csv_lines}
+
+
+def encode(lines):
+    for line in lines:
+        yield line.encode()
+
+
+def gzip_stream(chunks):
+    """Сжимает поток байтов в формат gzip по мере поступления."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    pending = []
+    pending_size = 0
+    for chunk in chunks:
+        pending.append(chunk)
+        pending_size += len(chunk)
+        if pending_size >= GZIP_BUFFER_SIZE:
+            compressed = compressor.compress(b''.join(pending))
+            pending, pending_size = [], 0
+            if compressed:
+                yield compressed
+    yield compressor.compress(b''.join(pending)) + compressor.flush()
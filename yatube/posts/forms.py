@@ -5,5 +5,5 @@ from .models import Post
 
 class PostForm(ModelForm):
     class Meta:
-        fields = ('text', 'group')
+        fields = ('text', 'group', 'image')
         model = Post
@@ -0,0 +1,93 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, Max
+from django.http import Http404
+
+from core.db_routers import read_primary
+
+from .cache import cache_is_shared, feed_version, invalidate_feeds, make_key
+from .models import Group
+
+GROUP_MAP = 'group-map'
+GROUP_DIRECTORY = 'group-directory'
+
+_local = {'version': None, 'expires': 0, 'by_slug': {}, 'by_id': {}}
+
+
+def group_cache_timeout():
+    """С кэшем в памяти процесса поколение групп не узнаёт о правках
+    в других процессах, поэтому записи живут GROUP_LOCAL_TIMEOUT."""
+    if cache_is_shared():
+        return settings.GROUP_CACHE_TIMEOUT
+    return settings.GROUP_LOCAL_TIMEOUT
+
+
+def _load():
+    """Карта групп текущего поколения: из памяти процесса, из кэша
+    или из базы. Поколение сверяется с кэшем на каждом вызове, а копия
+    процесса живёт не дольше GROUP_LOCAL_TIMEOUT, поэтому правка
+    группы видна во всех процессах и без общего кэша."""
+    global _local
+    version = feed_version(GROUP_MAP)
+    if _local['version'] == version and time.monotonic() < _local['expires']:
+        return _local
+    key = make_key(GROUP_MAP, version)
+    groups = cache.get(key)
+    if groups is None:
+        with read_primary():
+            groups = list(Group.objects.all())
+        cache.set(key, groups, group_cache_timeout())
+    _local = {
+        'version': version,
+        'expires': time.monotonic() + settings.GROUP_LOCAL_TIMEOUT,
+        'by_slug': {group.slug: group for group in groups},
+        'by_id': {group.pk: group for group in groups},
+    }
+    return _local
+
+
+def groups_by_id():
+    return _load()['by_id']
+
+
+def attach_groups(posts):
+    """Подставляет группы постов из кэша групп вместо JOIN или
+    запроса на каждый пост."""
+    groups = groups_by_id()
+    for post in posts:
+        group = groups.get(post.group_id)
+        if group is not None:
+            post.group = group
+    return posts
+
+
+def get_group_or_404(slug):
+    group = _load()['by_slug'].get(slug)
+    if group is None:
+        raise Http404('Группа не найдена')
+    return group
+
+
+def group_directory():
+    """Группы с числом постов и датой последнего поста,
+    посчитанные одним агрегирующим запросом."""
+    key = make_key(GROUP_DIRECTORY, feed_version(GROUP_DIRECTORY))
+    groups = cache.get(key)
+    if groups is None:
+        with read_primary():
+            groups = list(Group.objects.annotate(
+                posts_count=Count('posts'),
+                last_pub_date=Max('posts__pub_date'),
+            ).defer('description').order_by('title'))
+        cache.set(key, groups, group_cache_timeout())
+    return groups
+
+
+def invalidate_groups():
+    invalidate_feeds(GROUP_MAP, GROUP_DIRECTORY)
+
+
+def invalidate_group_directory():
+    invalidate_feeds(GROUP_DIRECTORY)
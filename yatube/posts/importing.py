@@ -0,0 +1,238 @@
+import csv
+import json
+from collections import Counter, namedtuple
+from itertools import islice
+
+from django.db import transaction
+from django.utils.dateparse import parse_datetime
+
+from . import groups, search, timelines
+from .cache import invalidate_feeds
+from .models import AuthorStats, Group, Post, User
+
+csv.field_size_limit(2 ** 31 - 1)
+
+
+# Запись файла импорта: номер строки, словарь полей или None и текст
+# ошибки, если запись не удалось разобрать.
+Row = namedtuple('Row', 'line record error')
+
+
+def read_jsonl(stream):
+    for line, text in enumerate(stream, start=1):
+        if not text.strip():
+            continue
+        try:
+            record = json.loads(text)
+        except ValueError as error:
+            yield Row(line, None, f'неверный JSON: {error}')
+            continue
+        if isinstance(record, dict):
+            yield Row(line, record, None)
+        else:
+            yield Row(line, None, 'запись должна быть объектом JSON')
+
+
+def read_csv(stream):
+    reader = csv.DictReader(stream)
+    while True:
+        try:
+            record = next(reader)
+        except StopIteration:
+            return
+        except csv.Error as error:
+            yield Row(reader.line_num, None, f'неверный CSV: {error}')
+            continue
+        yield Row(reader.line_num, record, None)
+
+
+READERS = {'jsonl': read_jsonl, 'csv': read_csv}
+
+
+class InvalidRecord(ValueError):
+    """Запись файла импорта, которую нельзя превратить в пост."""
+
+
+class ImportConflict(RuntimeError):
+    """Вставленные строки не удалось однозначно сопоставить с постами
+    порции: в таблицу одновременно писал кто-то ещё."""
+
+
+class Lookup:
+    """Отображение имени (username, slug) в id, пополняемое пачками:
+    в памяти держатся только уже встреченные имена."""
+
+    def __init__(self, model, field, create=None):
+        self.model = model
+        self.field = field
+        self.create = create
+        self.ids = {}
+
+    def resolve(self, names):
+        missing = {
+            name for name in names
+            if name and isinstance(name, str) and name not in self.ids
+        }
+        if not missing:
+            return
+        self.ids.update(self.model.objects.filter(
+            **{f'{self.field}__in': missing}
+        ).values_list(self.field, 'pk'))
+        missing -= self.ids.keys()
+        if missing and self.create is not None:
+            self.model.objects.bulk_create(
+                self.create(name) for name in missing
+            )
+            self.ids.update(self.model.objects.filter(
+                **{f'{self.field}__in': missing}
+            ).values_list(self.field, 'pk'))
+
+    def get(self, name):
+        return self.ids.get(name) if isinstance(name, str) else None
+
+
+class PostImporter:
+    """Потоковый импорт постов: записи читаются порциями, каждая
+    порция вставляется bulk_create в отдельной транзакции."""
+
+    def __init__(self, chunk_size=5000, batch_size=1000, create_missing=False):
+        self.chunk_size = chunk_size
+        self.batch_size = batch_size
+        self.authors = Lookup(User, 'username', create=(
+            (lambda name: User(username=name, password='!'))
+            if create_missing else None
+        ))
+        self.groups = Lookup(Group, 'slug', create=(
+            (lambda slug: Group(title=slug, slug=slug, description=''))
+            if create_missing else None
+        ))
+        self.totals = Counter()
+
+    def run(self, rows, skip=0, on_chunk=None, on_skip=None):
+        """Импортирует записи, пропустив первые skip. После каждой
+        зафиксированной порции вызывает on_chunk(обработано, totals),
+        для каждой отброшенной записи - on_skip(номер строки, причина)."""
+        rows = iter(rows)
+        processed = sum(1 for _ in islice(rows, skip))
+        while True:
+            chunk = list(islice(rows, self.chunk_size))
+            if not chunk:
+                break
+            self.import_chunk(chunk, on_skip)
+            processed += len(chunk)
+            if on_chunk is not None:
+                on_chunk(processed, self.totals)
+        return self.totals
+
+    def import_chunk(self, chunk, on_skip=None):
+        records = [row.record for row in chunk if row.record is not None]
+        self.authors.resolve(record.get('author') for record in records)
+        self.groups.resolve(record.get('group') for record in records)
+        posts = []
+        pub_dates = []
+        for row in chunk:
+            try:
+                post, pub_date = self.build(row)
+            except InvalidRecord as error:
+                self.totals['skipped'] += 1
+                if on_skip is not None:
+                    on_skip(row.line, str(error))
+                continue
+            posts.append(post)
+            pub_dates.append(pub_date)
+        with transaction.atomic():
+            last_pk = Post.objects.order_by('-pk').values_list(
+                'pk', flat=True
+            ).first() or 0
+            Post.objects.bulk_create(posts, batch_size=self.batch_size)
+            self.assign_pks(posts, last_pk)
+            self.restore_pub_dates(posts, pub_dates)
+            self.after_insert(posts)
+        self.totals['imported'] += len(posts)
+
+    def build(self, row):
+        """Несохранённый пост и дата публикации из файла (или None)."""
+        if row.error is not None:
+            raise InvalidRecord(row.error)
+        record = row.record
+        text = record.get('text')
+        if not text or not isinstance(text, str):
+            raise InvalidRecord('нет текста')
+        author_id = self.authors.get(record.get('author'))
+        if author_id is None:
+            raise InvalidRecord(
+                f'неизвестный автор {record.get("author")!r}'
+            )
+        group_slug = record.get('group')
+        group_id = self.groups.get(group_slug)
+        if group_slug and group_id is None:
+            raise InvalidRecord(f'неизвестная группа {group_slug!r}')
+        pub_date = record.get('pub_date') or None
+        if pub_date is not None:
+            try:
+                pub_date = parse_datetime(pub_date)
+            except (TypeError, ValueError):
+                pub_date = None
+            if pub_date is None:
+                raise InvalidRecord(
+                    f'неверная дата {record.get("pub_date")!r}'
+                )
+        post = Post(text=text, author_id=author_id, group_id=group_id)
+        post.render_text()
+        return post, pub_date
+
+    def assign_pks(self, posts, last_pk):
+        """На PostgreSQL bulk_create сам проставляет id вставленным
+        объектам. Иначе новые строки берутся после last_pk и сверяются
+        с порцией по числу и авторам; при расхождении порция
+        откатывается с ImportConflict."""
+        if all(post.pk is not None for post in posts):
+            return
+        rows = list(Post.objects.filter(pk__gt=last_pk).order_by(
+            'pk'
+        ).values_list('pk', 'author_id'))
+        if len(rows) != len(posts) or any(
+            author_id != post.author_id
+            for post, (pk, author_id) in zip(posts, rows)
+        ):
+            raise ImportConflict(
+                f'ожидалось {len(posts)} новых постов после id {last_pk}, '
+                f'найдено {len(rows)}'
+            )
+        for post, (pk, author_id) in zip(posts, rows):
+            post.pk = pk
+
+    def restore_pub_dates(self, posts, pub_dates):
+        """bulk_create ставит pub_date = now() (auto_now_add), даты
+        из файла записываются следом через bulk_update."""
+        dated = []
+        for post, pub_date in zip(posts, pub_dates):
+            if pub_date is not None:
+                post.pub_date = pub_date
+                dated.append(post)
+        Post.objects.bulk_update(
+            dated, ['pub_date'], batch_size=self.batch_size
+        )
+
+    def after_insert(self, posts):
+        """bulk_create не вызывает сигналы Post: счётчики авторов,
+        поисковый индекс, ленты подписок и кэш лент обновляются здесь."""
+        for author_id, count in Counter(
+            post.author_id for post in posts
+        ).items():
+            AuthorStats.change_posts_count(author_id, count)
+        for post in posts:
+            search.index_post(post)
+        timelines.fan_out((post.pk, post.author_id) for post in posts)
+        author_ids = {post.author_id for post in posts}
+        group_ids = {post.group_id for post in posts}
+        invalidate_feeds(
+            'index',
+            *(f'profile:{username}' for username in User.objects.filter(
+                pk__in=author_ids
+            ).values_list('username', flat=True)),
+            *(f'group:{slug}' for slug in Group.objects.filter(
+                pk__in=group_ids
+            ).values_list('slug', flat=True)),
+        )
+        groups.invalidate_groups()
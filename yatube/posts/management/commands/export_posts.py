@@ -0,0 +1,49 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.exporting import (
+    ENCODERS, encode, export_rows, gzip_stream, parse_period
+)
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает посты в JSONL или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', nargs='?', default='-',
+            help='Файл выгрузки или - для stdout',
+        )
+        parser.add_argument('--format', choices=ENCODERS, default='jsonl')
+        parser.add_argument('--gzip', action='store_true')
+        parser.add_argument('--author', help='username автора')
+        parser.add_argument('--group', help='slug группы')
+        parser.add_argument('--since', help='Начало периода, ISO 8601')
+        parser.add_argument('--until', help='Конец периода, ISO 8601')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        try:
+            since = parse_period(options['since'])
+            until = parse_period(options['until'])
+        except ValueError as error:
+            raise CommandError(error)
+        rows = export_rows(
+            author=options['author'],
+            group=options['group'],
+            since=since,
+            until=until,
+            chunk_size=options['chunk_size'],
+        )
+        chunks = encode(ENCODERS[options['format']](rows))
+        if options['gzip']:
+            chunks = gzip_stream(chunks)
+        path = options['path']
+        output = sys.stdout.buffer if path == '-' else open(path, 'wb')
+        try:
+            for chunk in chunks:
+                output.write(chunk)
+        finally:
+            if path != '-':
+                output.close()
@@ -0,0 +1,97 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.db.models import Count
+
+from posts.models import Group, Post, User
+from posts.seeding import seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Показывает планы и время запросов лент с индексами ленты '
+        'и без них. Все изменения базы откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', type=int, default=0,
+            help='Временно добавить столько постов перед замером',
+        )
+        parser.add_argument(
+            '--repeat', type=int, default=20,
+            help='Число повторов каждого запроса',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=10000,
+            help='Размер пачки bulk_create при заполнении',
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if options['seed']:
+                self.seed(options['seed'], options['batch_size'])
+            self.measure('С индексами ленты', options['repeat'])
+            with connection.cursor() as cursor:
+                for index in Post._meta.indexes:
+                    cursor.execute(
+                        f'DROP INDEX {connection.ops.quote_name(index.name)}'
+                    )
+            self.measure('Без индексов ленты', options['repeat'])
+            transaction.set_rollback(True)
+
+    def seed(self, total, batch_size):
+        seed(users=10, groups=5, posts=total, batch_size=batch_size)
+        self.stdout.write(f'Добавлено постов: {total}')
+
+    def feed_queries(self):
+        feed = Post.objects.for_feed()
+        limit = settings.LIMIT_OF_POSTS
+        total = Post.objects.count()
+        queries = {
+            'index': feed[:limit],
+            'index, середина': feed[total // 2:total // 2 + limit],
+        }
+        group = Group.objects.annotate(
+            posts_count=Count('posts')
+        ).order_by('-posts_count').first()
+        if group is not None:
+            queries['group'] = feed.filter(group=group)[:limit]
+        author = User.objects.annotate(
+            posts_count=Count('posts')
+        ).order_by('-posts_count').first()
+        if author is not None:
+            queries['profile'] = feed.filter(author=author)[:limit]
+        return queries
+
+    def measure(self, title, repeat):
+        self.stdout.write(self.style.MIGRATE_HEADING(title))
+        for name, queryset in self.feed_queries().items():
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                list(queryset.all())
+                timings.append(time.perf_counter() - started)
+            self.stdout.write(self.style.MIGRATE_LABEL(
+                f'{name}: медиана {statistics.median(timings) * 1000:.2f} мс'
+            ))
+            self.stdout.write(self.explain(queryset, title))
+
+    def explain(self, queryset, title):
+        """План запроса. Комментарий с названием прохода делает текст
+        запроса уникальным: иначе sqlite3 вернёт план из кэша
+        подготовленных выражений, составленный до удаления индексов."""
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'{connection.ops.explain_query_prefix()} {sql} '
+                f'/* {title} */',
+                params,
+            )
+            return '\n'.join(
+                ' '.join(str(column) for column in row)
+                for row in cursor.fetchall()
+            )
@@ -0,0 +1,87 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.importing import READERS, ImportConflict, PostImporter
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково импортирует посты из JSONL или CSV с полями '
+        'text, author (username), group (slug), pub_date'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл импорта или - для stdin')
+        parser.add_argument('--format', choices=READERS)
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--create-missing', action='store_true',
+            help='Создавать неизвестных авторов и группы',
+        )
+        parser.add_argument(
+            '--state',
+            help='Файл с числом обработанных записей (по умолчанию '
+                 '<path>.state)',
+        )
+        parser.add_argument(
+            '--resume', action='store_true',
+            help='Продолжить с записи, сохранённой в файле состояния',
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format'] or os.path.splitext(path)[1][1:]
+        if file_format not in READERS:
+            raise CommandError('Укажите --format jsonl или csv')
+        self.state_path = options['state'] or (
+            None if path == '-' else f'{path}.state'
+        )
+        skip = self.read_state() if options['resume'] else 0
+        importer = PostImporter(
+            chunk_size=options['chunk_size'],
+            batch_size=options['batch_size'],
+            create_missing=options['create_missing'],
+        )
+        self.started = time.perf_counter()
+        stream = sys.stdin if path == '-' else open(
+            path, encoding='utf-8', newline=''
+        )
+        with stream:
+            try:
+                totals = importer.run(
+                    READERS[file_format](stream), skip=skip,
+                    on_chunk=self.chunk_done, on_skip=self.record_skipped,
+                )
+            except ImportConflict as error:
+                raise CommandError(
+                    f'Порция откатилась: {error}. Повторите с --resume'
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано: {totals["imported"]}, '
+            f'пропущено: {totals["skipped"]}'
+        ))
+
+    def read_state(self):
+        if self.state_path is None or not os.path.exists(self.state_path):
+            return 0
+        with open(self.state_path) as state:
+            return int(state.read().strip() or 0)
+
+    def record_skipped(self, line, reason):
+        self.stderr.write(f'Строка {line} пропущена: {reason}')
+
+    def chunk_done(self, processed, totals):
+        if self.state_path is not None:
+            with open(self.state_path, 'w') as state:
+                state.write(str(processed))
+        elapsed = time.perf_counter() - self.started
+        self.stdout.write(
+            f'Обработано записей: {processed}, '
+            f'импортировано: {totals["imported"]}, '
+            f'пропущено: {totals["skipped"]}, '
+            f'{totals["imported"] / elapsed:.0f} постов/с'
+        )
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from posts.models import AuthorStats
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов и подписчиков авторов'
+
+    def handle(self, *args, **options):
+        authors = AuthorStats.rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Счётчики пересчитаны для авторов: {authors}'
+        ))
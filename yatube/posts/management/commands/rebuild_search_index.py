@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from posts import search
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает поисковый индекс постов'
+
+    def handle(self, *args, **options):
+        total = search.rebuild()
+        backend = 'SQLite FTS5' if search.use_fts() else 'SearchToken'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано постов: {total} ({backend})'
+        ))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts import timelines
+from posts.models import User
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает персональные ленты подписок пользователей'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'usernames', nargs='*',
+            help='Пользователи, по умолчанию - все',
+        )
+
+    def handle(self, *args, **options):
+        readers = User.objects.order_by('pk')
+        if options['usernames']:
+            readers = readers.filter(username__in=options['usernames'])
+        total = timelines.rebuild(readers.iterator())
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересобрано лент: {total}'
+        ))
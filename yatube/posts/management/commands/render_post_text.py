@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand
+
+from posts.cache import invalidate_post_cards
+from posts.models import Post
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет сохранённый HTML текста постов (text_html, '
+        'excerpt_html) для постов, где его ещё нет'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Пересчитать все посты, например после смены '
+                 'POST_EXCERPT_LENGTH',
+        )
+        parser.add_argument(
+            '--batch-size', type=int, default=500,
+            help='Число постов, обновляемых одним запросом',
+        )
+
+    def handle(self, *args, **options):
+        posts = Post.objects.only('pk', 'text', 'updated').order_by('pk')
+        if not options['all']:
+            posts = posts.filter(text_html='')
+        total = last_pk = 0
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk)[:options['batch_size']]
+            )
+            if not batch:
+                break
+            for post in batch:
+                post.render_text()
+            Post.objects.bulk_update(batch, ('text_html', 'excerpt_html'))
+            # bulk_update не меняет updated: карточки сбрасываются явно.
+            invalidate_post_cards((post.pk, post.updated) for post in batch)
+            total += len(batch)
+            last_pk = batch[-1].pk
+        self.stdout.write(self.style.SUCCESS(
+            f'Обновлено постов: {total}'
+        ))
@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.seeding import SEED_PASSWORD, seed
+
+
+class Command(BaseCommand):
+    help = 'Заполняет базу тестовыми пользователями, группами и постами'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=10)
+        parser.add_argument('--groups', type=int, default=5)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--batch-size', type=int, default=10000)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            seed(
+                users=options['users'],
+                groups=options['groups'],
+                posts=options['posts'],
+                batch_size=options['batch_size'],
+                progress=self.progress,
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Готово. Пароль созданных пользователей: {SEED_PASSWORD}'
+        ))
+
+    def progress(self, done, total):
+        self.stdout.write(f'Постов: {done}/{total}')
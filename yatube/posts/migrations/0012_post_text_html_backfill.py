@@ -0,0 +1,37 @@
+from django.conf import settings
+from django.db import migrations
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
+
+BATCH_SIZE = 500
+
+
+def render_text(apps, schema_editor):
+    """Заполняет text_html и excerpt_html постов, созданных до 0011,
+    так же, как Post.render_text."""
+    Post = apps.get_model('posts', 'Post')
+    posts = Post.objects.filter(text_html='').only('pk', 'text')
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk).order_by('pk')[:BATCH_SIZE])
+        if not batch:
+            break
+        for post in batch:
+            post.text_html = linebreaks(post.text, autoescape=True)
+            post.excerpt_html = linebreaks(
+                Truncator(post.text).chars(settings.POST_EXCERPT_LENGTH),
+                autoescape=True,
+            )
+        Post.objects.bulk_update(batch, ('text_html', 'excerpt_html'))
+        last_pk = batch[-1].pk
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0011_post_text_html'),
+    ]
+
+    operations = [
+        migrations.RunPython(render_text, migrations.RunPython.noop),
+    ]
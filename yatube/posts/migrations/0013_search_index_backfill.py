@@ -0,0 +1,67 @@
+from django.db import migrations
+
+BATCH_SIZE = 500
+FTS_TABLE = 'posts_post_fts'
+
+
+def index_posts(apps, schema_editor):
+    """Индексирует для поиска посты, созданные до 0007, так же, как
+    search.index_post: в FTS5, если таблица есть, иначе в SearchToken.
+    Уже проиндексированные посты пропускаются."""
+    from posts.search import TOKEN_LENGTH, tokenize
+
+    Post = apps.get_model('posts', 'Post')
+    SearchToken = apps.get_model('posts', 'SearchToken')
+    connection = schema_editor.connection
+    fts = FTS_TABLE in connection.introspection.table_names()
+    posts = Post.objects.only('pk', 'text')
+    last_pk = 0
+    while True:
+        batch = list(posts.filter(pk__gt=last_pk).order_by('pk')[:BATCH_SIZE])
+        if not batch:
+            break
+        last_pk = batch[-1].pk
+        pks = [post.pk for post in batch]
+        if fts:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'SELECT rowid FROM {FTS_TABLE} WHERE rowid IN '
+                    f'({", ".join(["%s"] * len(pks))})',
+                    pks,
+                )
+                indexed = {row[0] for row in cursor.fetchall()}
+                cursor.executemany(
+                    f'INSERT INTO {FTS_TABLE} (rowid, tokens) VALUES (%s, %s)',
+                    [
+                        (post.pk, ' '.join(tokenize(post.text)))
+                        for post in batch if post.pk not in indexed
+                    ],
+                )
+            continue
+        indexed = set(SearchToken.objects.filter(
+            post_id__in=pks
+        ).values_list('post_id', flat=True))
+        tokens = []
+        for post in batch:
+            if post.pk in indexed:
+                continue
+            weights = {}
+            for token in tokenize(post.text):
+                token = token[:TOKEN_LENGTH]
+                weights[token] = weights.get(token, 0) + 1
+            tokens.extend(
+                SearchToken(token=token, post_id=post.pk, weight=weight)
+                for token, weight in weights.items()
+            )
+        SearchToken.objects.bulk_create(tokens)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_text_html_backfill'),
+    ]
+
+    operations = [
+        migrations.RunPython(index_posts, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,10 @@
 from django.conf import settings
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+from django.utils.html import linebreaks
+from django.utils.text import Truncator
 
 
 User = get_user_model()
@@ -36,14 +40,38 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self, variant='index'):
+        """Посты для лент: автор одним JOIN-запросом без неиспользуемых
+        в шаблонах колонок. Из текста поста читается только HTML,
+        который выводит карточка variant. Группы подставляет
+        groups.attach_groups для постов страницы."""
+        queryset = self.select_related('author').defer(
+            'text',
+            'text_html' if variant == 'profile' else 'excerpt_html',
+            'author__password',
+            'author__last_login',
+            'author__is_superuser',
+            'author__email',
+            'author__is_staff',
+            'author__date_joined',
+        )
+        return queryset
+
+
 class Post(models.Model):
     """Модель представления Постов(записей)
     имеет следующую стркутуру и ограничения:
     текст - text;
     дата публикации - pub_date(автоматически
     добавляется текущая дата);
+    дата изменения - updated(обновляется при каждом сохранении);
     автор - author (ссылка на модель User)
-    сообщество - group (ссылка на модель Group)"""
+    сообщество - group (ссылка на модель Group)
+    картинка - image (миниатюры создаёт фоновая задача,
+    thumbnails_ready - миниатюры готовы)
+    HTML текста и его начала - text_html, excerpt_html
+    (пересчитываются при сохранении текста)"""
     text = models.TextField(
         verbose_name="Текст поста",
         help_text="Введите текст поста"
@@ -53,6 +81,11 @@ class Post(models.Model):
         auto_now_add=True,
         help_text="Укажите дату публикации",
     )
+    updated = models.DateTimeField(
+        verbose_name="Дата изменения",
+        auto_now=True,
+        db_index=True,
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -69,11 +102,232 @@ class Post(models.Model):
         verbose_name="Группа",
         help_text="Выбор группы",
     )
+    image = models.ImageField(
+        verbose_name="Картинка",
+        upload_to='posts/',
+        blank=True,
+        help_text="Загрузите картинку",
+    )
+    thumbnails_ready = models.BooleanField(
+        verbose_name="Миниатюры готовы",
+        default=False,
+        editable=False,
+    )
+    text_html = models.TextField(
+        verbose_name="HTML текста",
+        blank=True,
+        editable=False,
+    )
+    excerpt_html = models.TextField(
+        verbose_name="HTML начала текста",
+        blank=True,
+        editable=False,
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('pub_date', 'id'), name='post_pub_date_id_idx'
+            ),
+            models.Index(
+                fields=('group', 'pub_date'), name='post_group_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', 'pub_date'),
+                name='post_author_pub_date_idx',
+            ),
+        )
         verbose_name = 'пост'
         verbose_name_plural = 'посты'
 
     def __str__(self) -> str:
         return self.text[:settings.CROP_TEXT]
+
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields is None or 'text' in update_fields:
+            self.render_text()
+            if update_fields is not None:
+                update_fields = {*update_fields, 'text_html', 'excerpt_html'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    def render_text(self):
+        """Заполняет text_html и excerpt_html: ленты выводят готовый
+        HTML и не обрабатывают текст при каждой отрисовке."""
+        self.text_html = linebreaks(self.text, autoescape=True)
+        self.excerpt_html = linebreaks(
+            Truncator(self.text).chars(settings.POST_EXCERPT_LENGTH),
+            autoescape=True,
+        )
+
+
+class AuthorStats(models.Model):
+    """Модель денормализованных счётчиков автора:
+    автор - author (ссылка на модель User);
+    количество постов - posts_count;
+    количество подписчиков - followers_count
+    """
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='stats',
+        verbose_name="Автор",
+    )
+    posts_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество постов",
+    )
+    followers_count = models.PositiveIntegerField(
+        default=0,
+        verbose_name="Количество подписчиков",
+    )
+
+    class Meta:
+        verbose_name = 'статистика автора'
+        verbose_name_plural = 'статистика авторов'
+
+    def __str__(self) -> str:
+        return f'{self.author}: {self.posts_count}'
+
+    @classmethod
+    def change_posts_count(cls, author_id, delta):
+        """Сдвигает счётчик постов автора на delta."""
+        cls._change_count(author_id, 'posts_count', delta)
+
+    @classmethod
+    def change_followers_count(cls, author_id, delta):
+        """Сдвигает счётчик подписчиков автора на delta."""
+        cls._change_count(author_id, 'followers_count', delta)
+
+    @classmethod
+    def _change_count(cls, author_id, field, delta):
+        """Отсутствующая запись создаётся по точному подсчёту.
+        Счётчик не опускается ниже нуля: посты, добавленные в обход
+        сигналов (bulk_create, сырой INSERT), его не увеличивали."""
+        with transaction.atomic():
+            updated = cls.objects.filter(author_id=author_id).update(
+                **{field: Greatest(F(field) + delta, 0)}
+            )
+            if not updated and delta > 0:
+                cls.objects.update_or_create(
+                    author_id=author_id,
+                    defaults={
+                        'posts_count': Post.objects.filter(
+                            author_id=author_id
+                        ).count(),
+                        'followers_count': Follow.objects.filter(
+                            author_id=author_id
+                        ).count(),
+                    },
+                )
+
+    @classmethod
+    def rebuild(cls):
+        """Пересчитывает счётчики всех авторов по постам и подпискам."""
+        posts = dict(
+            Post.objects.order_by().values_list('author').annotate(
+                Count('pk')
+            )
+        )
+        followers = dict(
+            Follow.objects.order_by().values_list('author').annotate(
+                Count('pk')
+            )
+        )
+        authors = posts.keys() | followers.keys()
+        with transaction.atomic():
+            cls.objects.exclude(author_id__in=authors).delete()
+            for author_id in authors:
+                cls.objects.update_or_create(
+                    author_id=author_id,
+                    defaults={
+                        'posts_count': posts.get(author_id, 0),
+                        'followers_count': followers.get(author_id, 0),
+                    },
+                )
+        return len(authors)
+
+
+class Follow(models.Model):
+    """Модель подписки пользователя на автора:
+    подписчик - user (ссылка на модель User);
+    автор - author (ссылка на модель User)
+    """
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name="Подписчик",
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name="Автор",
+    )
+
+    class Meta:
+        unique_together = ('user', 'author')
+        verbose_name = 'подписка'
+        verbose_name_plural = 'подписки'
+
+    def __str__(self) -> str:
+        return f'{self.user} -> {self.author}'
+
+
+class TimelineEntry(models.Model):
+    """Модель записи персональной ленты (fan-out при публикации):
+    читатель - reader (ссылка на модель User);
+    пост - post (ссылка на модель Post)
+    """
+    reader = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name="Читатель",
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name="Пост",
+    )
+
+    class Meta:
+        unique_together = ('reader', 'post')
+        verbose_name = 'запись ленты'
+        verbose_name_plural = 'записи лент'
+
+    def __str__(self) -> str:
+        return f'{self.reader}: {self.post_id}'
+
+
+class SearchToken(models.Model):
+    """Запись обратного индекса для поиска по постам
+    (используется, когда в базе нет SQLite FTS5):
+    основа слова - token;
+    пост - post (ссылка на модель Post);
+    число вхождений основы в текст - weight
+    """
+    token = models.CharField(max_length=64, verbose_name="Основа слова")
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='search_tokens',
+        verbose_name="Пост",
+    )
+    weight = models.PositiveIntegerField(
+        default=1,
+        verbose_name="Число вхождений",
+    )
+
+    class Meta:
+        unique_together = ('token', 'post')
+        verbose_name = 'поисковый токен'
+        verbose_name_plural = 'поисковые токены'
+
+    def __str__(self) -> str:
+        return self.token
@@ -0,0 +1,247 @@
+import base64
+import binascii
+from collections.abc import Sequence
+
+from django.core.paginator import EmptyPage, Page, Paginator
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+NEXT = 'n'
+PREVIOUS = 'p'
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(direction, post):
+    """Упаковывает позицию поста (pub_date, id) в непрозрачный токен."""
+    raw = f'{direction}|{post.pub_date.isoformat()}|{post.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Разбирает токен курсора, возвращает (направление, дата, id)."""
+    try:
+        raw = base64.urlsafe_b64decode(
+            cursor + '=' * (-len(cursor) % 4)
+        ).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError, TypeError):
+        raise InvalidCursor(cursor)
+    if direction not in (NEXT, PREVIOUS) or pub_date is None:
+        raise InvalidCursor(cursor)
+    return direction, pub_date, pk
+
+
+def keyset(queryset, direction, pub_date, pk, date='pub_date', key='pk'):
+    """Упорядочивает queryset по (date, key) и оставляет записи
+    после позиции курсора (pub_date, pk)."""
+    if direction == NEXT:
+        queryset = queryset.order_by(f'-{date}', f'-{key}')
+        if pk is None:
+            return queryset
+        return queryset.filter(
+            Q(**{f'{date}__lt': pub_date})
+            | Q(**{date: pub_date, f'{key}__lt': pk})
+        )
+    queryset = queryset.order_by(date, key)
+    return queryset.filter(
+        Q(**{f'{date}__gt': pub_date})
+        | Q(**{date: pub_date, f'{key}__gt': pk})
+    )
+
+
+class CursorPage(Sequence):
+    """Страница ленты, полученная по курсору (без номера страницы)."""
+
+    def __init__(self, object_list, paginator, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<Cursor page of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class CursorPaginator:
+    """Пагинатор по ключу (pub_date, id) для лент постов.
+
+    В отличие от Paginator не выполняет COUNT(*) и OFFSET: страница
+    выбирается условием по позиции последнего показанного поста,
+    поэтому время выборки не зависит от глубины страницы.
+    """
+    cursor_based = True
+
+    def __init__(self, object_list, per_page):
+        self.object_list = object_list
+        self.per_page = int(per_page)
+
+    def get_page(self, cursor):
+        """Возвращает страницу, при неверном курсоре - первую."""
+        try:
+            return self.page(cursor)
+        except InvalidCursor:
+            return self.page(None)
+
+    def fetch(self, direction, pub_date, pk, limit):
+        """До limit постов после позиции (pub_date, pk) в направлении
+        direction: для NEXT - от новых к старым, для PREVIOUS -
+        от старых к новым. pk None - с начала ленты."""
+        return list(keyset(
+            self.object_list, direction, pub_date, pk
+        )[:limit])
+
+    def page(self, cursor):
+        if cursor:
+            direction, pub_date, pk = decode_cursor(cursor)
+        else:
+            direction, pub_date, pk = NEXT, None, None
+        posts = self.fetch(direction, pub_date, pk, self.per_page + 1)
+        has_more = len(posts) > self.per_page
+        posts = posts[:self.per_page]
+        if direction == NEXT:
+            has_next, has_previous = has_more, pk is not None
+        else:
+            if not posts:
+                return self.page(None)
+            posts.reverse()
+            has_next, has_previous = True, has_more
+        return CursorPage(
+            posts,
+            self,
+            encode_cursor(NEXT, posts[-1]) if has_next and posts else None,
+            encode_cursor(PREVIOUS, posts[0]) if has_previous and posts
+            else None,
+        )
+
+
+class FeedPage(Page):
+    """Страница, о следующей странице которой известно по лишней
+    выбранной строке, а не по общему числу постов."""
+
+    def __init__(self, object_list, number, paginator, has_next):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+
+    def has_next(self):
+        return self._has_next
+
+    def next_page_number(self):
+        return self.number + 1
+
+    @property
+    def elided_page_range(self):
+        return self.paginator.get_elided_page_range(self.number)
+
+
+class FeedPaginator(Paginator):
+    """Постраничный пагинатор для больших лент.
+
+    count - известное заранее число объектов (поддерживаемый счётчик
+    или закэшированный подсчёт), тогда COUNT(*) выполняется, только
+    если запрошена страница за пределами этого числа.
+    Страница выбирается запросом LIMIT per_page + 1, лишняя строка
+    показывает, есть ли следующая. Для навигации отдаётся сокращённый
+    диапазон страниц: края и окно вокруг текущей.
+    """
+    ELLIPSIS = '…'
+
+    def __init__(
+        self, object_list, per_page, count=None, on_each_side=2, on_ends=1,
+        **kwargs
+    ):
+        super().__init__(object_list, per_page, **kwargs)
+        self.known_count = count
+        self.on_each_side = on_each_side
+        self.on_ends = on_ends
+
+    @cached_property
+    def count(self):
+        if self.known_count is not None:
+            return self.known_count
+        return Paginator.count.func(self)
+
+    def forget_count(self):
+        """Отбрасывает известное число: следующее обращение к count
+        выполнит COUNT(*)."""
+        self.known_count = None
+        self.__dict__.pop('count', None)
+        self.__dict__.pop('num_pages', None)
+
+    def validate_number(self, number):
+        """Если известное число устарело и страница за его пределами,
+        число пересчитывается запросом COUNT(*)."""
+        try:
+            return super().validate_number(number)
+        except EmptyPage:
+            if self.known_count is None:
+                raise
+        self.forget_count()
+        return super().validate_number(number)
+
+    def page(self, number):
+        """Пустая выборка страницы дальше первой значит, что известное
+        число завышено (посты удалены): число пересчитывается, и
+        страница за его пределами даёт EmptyPage, как в Paginator."""
+        number = self.validate_number(number)
+        rows = self.rows(number)
+        if not rows and number > 1 and self.known_count is not None:
+            self.forget_count()
+            number = super().validate_number(number)
+            rows = self.rows(number)
+        return FeedPage(
+            rows[:self.per_page], number, self, len(rows) > self.per_page
+        )
+
+    def get_page(self, number):
+        """Как Paginator.get_page, но и страница, оказавшаяся пустой
+        после пересчёта, заменяется последней."""
+        try:
+            return super().get_page(number)
+        except EmptyPage:
+            return self.page(self.num_pages)
+
+    def rows(self, number):
+        bottom = (number - 1) * self.per_page
+        return list(self.object_list[bottom:bottom + self.per_page + 1])
+
+    def get_elided_page_range(self, number=1):
+        """Номера страниц с многоточиями на месте пропусков."""
+        number = self.validate_number(number)
+        last = self.num_pages
+        if last <= (self.on_each_side + self.on_ends) * 2 + 1:
+            yield from self.page_range
+            return
+        window_start = max(number - self.on_each_side, 1)
+        window_end = min(number + self.on_each_side, last)
+        if window_start > self.on_ends + 2:
+            yield from range(1, self.on_ends + 1)
+            yield self.ELLIPSIS
+        else:
+            window_start = 1
+        if window_end < last - self.on_ends - 1:
+            yield from range(window_start, window_end + 1)
+            yield self.ELLIPSIS
+            yield from range(last - self.on_ends + 1, last + 1)
+        else:
+            yield from range(window_start, last + 1)
@@ -0,0 +1,269 @@
+import math
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import Case, Count, F, FloatField, Sum, When
+from django.db.models.expressions import RawSQL
+
+from .cache import feed_state
+from .models import Post, SearchToken
+
+FTS_TABLE = 'posts_post_fts'
+# Длина основы в SearchToken.token.
+TOKEN_LENGTH = 64
+
+VOWELS = 'аеиоуыэюя'
+PERFECTIVE_GERUND = (
+    ('вшись', 'вши', 'в'),
+    ('ившись', 'ывшись', 'ивши', 'ывши', 'ив', 'ыв'),
+)
+REFLEXIVE = ('ся', 'сь')
+ADJECTIVE = (
+    'ими', 'ыми', 'его', 'ого', 'ему', 'ому', 'ее', 'ие', 'ые', 'ое',
+    'ей', 'ий', 'ый', 'ой', 'ем', 'им', 'ым', 'ом', 'их', 'ых', 'ую',
+    'юю', 'ая', 'яя', 'ою', 'ею',
+)
+PARTICIPLE = (
+    ('ем', 'нн', 'вш', 'ющ', 'щ'),
+    ('ивш', 'ывш', 'ующ'),
+)
+VERB = (
+    (
+        'ете', 'йте', 'ешь', 'нно', 'ла', 'на', 'ли', 'ем', 'ло', 'но',
+        'ет', 'ют', 'ны', 'ть', 'й', 'л', 'н',
+    ),
+    (
+        'ейте', 'уйте', 'ила', 'ыла', 'ена', 'ите', 'или', 'ыли', 'ило',
+        'ыло', 'ено', 'ует', 'уют', 'ены', 'ить', 'ыть', 'ишь', 'ей',
+        'уй', 'ил', 'ыл', 'им', 'ым', 'ен', 'ят', 'ит', 'ыт', 'ую', 'ю',
+    ),
+)
+NOUN = (
+    'иями', 'ями', 'ами', 'ией', 'иям', 'ием', 'иях', 'ев', 'ов', 'ие',
+    'ье', 'еи', 'ии', 'ей', 'ой', 'ий', 'ям', 'ем', 'ам', 'ом', 'ах',
+    'ях', 'ию', 'ью', 'ия', 'ья', 'а', 'е', 'и', 'й', 'о', 'у', 'ы',
+    'ь', 'ю', 'я',
+)
+DERIVATIONAL = ('ость', 'ост')
+SUPERLATIVE = ('ейше', 'ейш')
+
+TOKEN_RE = re.compile(r'\w+')
+
+
+def _region(word, start=0):
+    """Начало области после первого сочетания гласная-согласная."""
+    for position in range(start + 1, len(word)):
+        if word[position] not in VOWELS and word[position - 1] in VOWELS:
+            return position + 1
+    return len(word)
+
+
+def _strip(word, endings, start, preceded_by=None):
+    """Отрезает самое длинное окончание из endings, лежащее в word[start:].
+    preceded_by - буквы, одна из которых должна стоять перед окончанием."""
+    for ending in sorted(endings, key=len, reverse=True):
+        if not word.endswith(ending) or len(word) - len(ending) < start:
+            continue
+        if preceded_by is not None:
+            before = len(word) - len(ending) - 1
+            if before < start or word[before] not in preceded_by:
+                continue
+        return word[:-len(ending)]
+    return None
+
+
+def _strip_grouped(word, groups, start):
+    return (
+        _strip(word, groups[0], start, preceded_by='ая')
+        or _strip(word, groups[1], start)
+    )
+
+
+def stem(word):
+    """Русский стеммер по алгоритму Snowball (Портера)."""
+    word = word.replace('ё', 'е')
+    rv = next(
+        (index + 1 for index, letter in enumerate(word) if letter in VOWELS),
+        len(word)
+    )
+    r2 = _region(word, _region(word) - 1)
+    # Шаг 1: деепричастия, иначе возвратные частицы и окончания.
+    stripped = _strip_grouped(word, PERFECTIVE_GERUND, rv)
+    if stripped is None:
+        word = _strip(word, REFLEXIVE, rv) or word
+        adjective = _strip(word, ADJECTIVE, rv)
+        if adjective is not None:
+            word = _strip_grouped(adjective, PARTICIPLE, rv) or adjective
+        else:
+            word = (
+                _strip_grouped(word, VERB, rv)
+                or _strip(word, NOUN, rv)
+                or word
+            )
+    else:
+        word = stripped
+    # Шаг 2.
+    word = _strip(word, ('и',), rv) or word
+    # Шаг 3: словообразовательные суффиксы в R2.
+    word = _strip(word, DERIVATIONAL, r2) or word
+    # Шаг 4.
+    if word.endswith('нн') and len(word) - 1 > rv:
+        return word[:-1]
+    superlative = _strip(word, SUPERLATIVE, rv)
+    if superlative is not None:
+        word = superlative
+        return word[:-1] if word.endswith('нн') else word
+    return _strip(word, ('ь',), rv) or word
+
+
+def tokenize(text):
+    """Нормализованные основы слов текста в порядке появления."""
+    return [
+        stem(word) for word in TOKEN_RE.findall(text.lower())
+        if len(word) > 1 or word.isdigit()
+    ]
+
+
+_fts_available = {}
+
+
+def use_fts():
+    """Используется ли таблица SQLite FTS5 в текущей базе."""
+    if connection.vendor != 'sqlite':
+        return False
+    name = connection.settings_dict['NAME']
+    if name not in _fts_available:
+        _fts_available[name] = (
+            FTS_TABLE in connection.introspection.table_names()
+        )
+    return _fts_available[name]
+
+
+def index_post(post):
+    """Обновляет поисковый индекс поста."""
+    tokens = tokenize(post.text)
+    if use_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post.pk]
+            )
+            cursor.execute(
+                f'INSERT INTO {FTS_TABLE} (rowid, tokens) VALUES (%s, %s)',
+                [post.pk, ' '.join(tokens)],
+            )
+        return
+    weights = {}
+    for token in tokens:
+        weights[token] = weights.get(token, 0) + 1
+    SearchToken.objects.filter(post_id=post.pk).delete()
+    SearchToken.objects.bulk_create(
+        SearchToken(token=token[:TOKEN_LENGTH], post_id=post.pk, weight=weight)
+        for token, weight in weights.items()
+    )
+
+
+def remove_post(post_id):
+    if use_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s', [post_id]
+            )
+        return
+    SearchToken.objects.filter(post_id=post_id).delete()
+
+
+def rebuild(chunk_size=2000):
+    """Переиндексирует все посты, возвращает их число."""
+    if use_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    else:
+        SearchToken.objects.all().delete()
+    total = 0
+    for post in Post.objects.only('pk', 'text').iterator(
+        chunk_size=chunk_size
+    ):
+        index_post(post)
+        total += 1
+    return total
+
+
+def query_tokens(query):
+    """Уникальные основы слов запроса. Для SearchToken они обрезаются
+    так же, как при записи индекса."""
+    tokens = tokenize(query)
+    if not use_fts():
+        tokens = [token[:TOKEN_LENGTH] for token in tokens]
+    return list(dict.fromkeys(tokens))
+
+
+def fts_match(tokens):
+    return ' '.join(f'"{token}"' for token in tokens)
+
+
+def token_matches(tokens):
+    """Строки SearchToken постов, содержащих все основы tokens."""
+    return SearchToken.objects.filter(token__in=tokens).values(
+        'post'
+    ).annotate(matched=Count('token')).filter(matched=len(tokens))
+
+
+class RawSubquery(RawSQL):
+    """Сырой подзапрос для фильтра pk__in. RawSQL оборачивает SQL
+    в скобки, и SQLite читает IN ((SELECT ...)) как скалярный
+    подзапрос - только первую строку."""
+
+    def as_sql(self, compiler, connection):
+        return self.sql, self.params
+
+
+def matching_posts(query):
+    """Подзапрос id всех постов, содержащих все слова запроса, без
+    ранжирования и ограничения числа: для фильтра pk__in."""
+    tokens = query_tokens(query)
+    if not tokens:
+        return Post.objects.none().values('pk')
+    if use_fts():
+        return RawSubquery(
+            f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s',
+            [fts_match(tokens)],
+        )
+    return token_matches(tokens).values('post')
+
+
+def search(query, limit=None):
+    """id постов, содержащих все слова запроса, от лучших к худшим."""
+    limit = limit or settings.SEARCH_RESULTS_LIMIT
+    tokens = query_tokens(query)
+    if not tokens:
+        return []
+    if use_fts():
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY bm25({FTS_TABLE}) LIMIT %s',
+                [fts_match(tokens), limit],
+            )
+            return [row[0] for row in cursor.fetchall()]
+    # Число постов для idf берётся из состояния главной ленты: оно
+    # считается раз на поколение ленты, а не при каждом поиске.
+    total = feed_state('index', Post.objects.all())[1]['total'] or 1
+    frequencies = dict(
+        SearchToken.objects.filter(token__in=tokens).values_list(
+            'token'
+        ).annotate(Count('post')).order_by()
+    )
+    if len(frequencies) < len(tokens):
+        return []
+    score = Sum(Case(
+        *(When(token=token, then=F('weight') * math.log(
+            1 + total / frequency
+        )) for token, frequency in frequencies.items()),
+        output_field=FloatField(),
+    ))
+    return list(
+        token_matches(tokens).annotate(score=score).order_by(
+            '-score', '-post'
+        ).values_list('post', flat=True)[:limit]
+    )
@@ -0,0 +1,63 @@
+import random
+import uuid
+
+from django.contrib.auth.hashers import make_password
+from faker import Faker
+
+from .models import AuthorStats, Group, Post, User
+
+SEED_PASSWORD = 'seed-password'
+TEXTS_POOL_SIZE = 1000
+
+
+def seed(users=0, groups=0, posts=0, batch_size=10000, progress=None):
+    """Заполняет базу пользователями, группами и постами пачками
+    bulk_create. Авторы и группы постов выбираются случайно из
+    созданных и уже существующих. Возвращает число созданных постов.
+    """
+    fake = Faker('ru_RU')
+    run = uuid.uuid4().hex[:6]
+    password = make_password(SEED_PASSWORD)
+    User.objects.bulk_create(
+        User(
+            username=f'{fake.user_name()}-{run}-{number}',
+            first_name=fake.first_name(),
+            last_name=fake.last_name(),
+            password=password,
+        ) for number in range(users)
+    )
+    Group.objects.bulk_create(
+        Group(
+            title=fake.sentence(nb_words=3)[:200],
+            slug=f'group-{run}-{number}',
+            description=fake.paragraph(),
+        ) for number in range(groups)
+    )
+    author_ids = list(User.objects.values_list('pk', flat=True))
+    group_ids = [None, *Group.objects.values_list('pk', flat=True)]
+    if posts and not author_ids:
+        raise ValueError('Для постов нужен хотя бы один пользователь')
+    # Образцы текстов с готовым HTML, bulk_create не вызывает save.
+    samples = []
+    for _ in range(min(posts, TEXTS_POOL_SIZE)):
+        sample = Post(text=fake.paragraph(nb_sentences=5))
+        sample.render_text()
+        samples.append(sample)
+    for start in range(0, posts, batch_size):
+        Post.objects.bulk_create(
+            Post(
+                author_id=random.choice(author_ids),
+                group_id=random.choice(group_ids),
+                text=sample.text,
+                text_html=sample.text_html,
+                excerpt_html=sample.excerpt_html,
+            )
+            for sample in random.choices(
+                samples, k=min(batch_size, posts - start)
+            )
+        )
+        if progress is not None:
+            progress(min(start + batch_size, posts), posts)
+    if posts:
+        AuthorStats.rebuild()
+    return posts
@@ -0,0 +1,232 @@
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from jobs.queue import enqueue
+
+from . import groups, thumbnails, timelines
+from .cache import invalidate_feeds, invalidate_post_cards
+from .models import AuthorStats, Follow, Group, Post, User
+
+AUTHOR_NAME_FIELDS = {'username', 'first_name', 'last_name'}
+
+
+def author_names_changed(user):
+    """Изменились ли загруженные или заданные поля имени автора."""
+    return any(
+        field in user.__dict__
+        and user.__dict__[field] != user._original_names.get(field)
+        for field in AUTHOR_NAME_FIELDS
+    )
+
+
+def image_name(post):
+    """Имя картинки без обращения к отложенному полю."""
+    image = post.__dict__.get('image')
+    return getattr(image, 'name', image) or ''
+
+
+@receiver(post_init, sender=Post)
+def remember_post_state(sender, instance, **kwargs):
+    """Запоминает исходных автора, группу и картинку, чтобы заметить
+    их смену."""
+    instance._original_author_id = instance.__dict__.get('author_id')
+    instance._original_group_id = instance.__dict__.get('group_id')
+    instance._original_image = image_name(instance)
+
+
+@receiver(post_init, sender=User)
+def remember_author_names(sender, instance, **kwargs):
+    """Запоминает исходные имя и username: карточки и ленты
+    сбрасываются, только если они изменились, а при смене username -
+    и лента профиля по старому адресу."""
+    instance._original_names = {
+        field: instance.__dict__[field]
+        for field in AUTHOR_NAME_FIELDS if field in instance.__dict__
+    }
+
+
+@receiver(post_init, sender=Group)
+def remember_slug(sender, instance, **kwargs):
+    instance._original_slug = instance.__dict__.get('slug')
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    original_author_id = instance._original_author_id
+    if created:
+        AuthorStats.change_posts_count(instance.author_id, 1)
+    elif original_author_id != instance.author_id:
+        if original_author_id is not None:
+            AuthorStats.change_posts_count(original_author_id, -1)
+        AuthorStats.change_posts_count(instance.author_id, 1)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    AuthorStats.change_posts_count(instance.author_id, -1)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def drop_post_cards(sender, instance, **kwargs):
+    invalidate_post_cards([(instance.pk, instance.updated)])
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def drop_group_post_cards(sender, instance, **kwargs):
+    invalidate_post_cards(
+        instance.posts.values_list('pk', 'updated').iterator()
+    )
+
+
+@receiver(post_save, sender=User)
+def drop_author_post_cards(sender, instance, created, **kwargs):
+    """Карточки выводят имя автора: вход, смена пароля и регистрация
+    их не меняют."""
+    if created or not author_names_changed(instance):
+        return
+    invalidate_post_cards(
+        instance.posts.values_list('pk', 'updated').iterator()
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def drop_post_feeds(sender, instance, **kwargs):
+    """Сбрасывает анонимный кэш лент, в которых виден пост."""
+    author_ids = {instance.author_id, instance._original_author_id}
+    group_ids = {instance.group_id, instance._original_group_id}
+    invalidate_feeds(
+        'index',
+        *(f'profile:{username}' for username in User.objects.filter(
+            pk__in=author_ids
+        ).values_list('username', flat=True)),
+        *(f'group:{slug}' for slug in Group.objects.filter(
+            pk__in=group_ids
+        ).values_list('slug', flat=True)),
+    )
+    if group_ids != {None}:
+        groups.invalidate_group_directory()
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def drop_group_feeds(sender, instance, **kwargs):
+    """Название группы выводится и в профилях её авторов."""
+    invalidate_feeds(
+        'index',
+        *(f'group:{slug}' for slug in {
+            instance.slug, instance._original_slug
+        } if slug),
+        *(f'profile:{username}' for username in User.objects.filter(
+            posts__group=instance
+        ).distinct().values_list('username', flat=True)),
+    )
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def drop_group_map(sender, instance, **kwargs):
+    groups.invalidate_groups()
+
+
+@receiver(post_save, sender=User)
+def drop_author_feeds(sender, instance, created, **kwargs):
+    """Имя автора выводится и в лентах групп с его постами.
+    Регистрация, вход и смена пароля ленты не меняют."""
+    if created or not author_names_changed(instance):
+        return
+    invalidate_feeds(
+        'index',
+        *(f'profile:{username}' for username in {
+            instance.username, instance._original_names.get('username')
+        } if username),
+        *(f'group:{slug}' for slug in Group.objects.filter(
+            posts__author=instance
+        ).distinct().values_list('slug', flat=True)),
+    )
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, raw=False, **kwargs):
+    if not raw:
+        enqueue('posts.reindex_posts', post_id=instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    enqueue('posts.reindex_posts', post_id=instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_created_post(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        enqueue('posts.fan_out_posts', post_id=instance.pk)
+
+
+@receiver(pre_save, sender=Post)
+def reset_thumbnails(sender, instance, raw=False, **kwargs):
+    if not raw and image_name(instance) != instance._original_image:
+        instance.thumbnails_ready = False
+
+
+@receiver(post_save, sender=Post)
+def make_thumbnails(sender, instance, raw=False, **kwargs):
+    """Миниатюры новой картинки создаются в фоне, старой - удаляются."""
+    if raw or image_name(instance) == instance._original_image:
+        return
+    if instance._original_image:
+        thumbnails.delete(instance._original_image)
+    if instance.image:
+        enqueue('posts.make_thumbnails', post_id=instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def delete_thumbnails(sender, instance, **kwargs):
+    if image_name(instance):
+        thumbnails.delete(image_name(instance))
+
+
+@receiver(post_save, sender=Follow)
+def apply_follow(sender, instance, created, raw=False, **kwargs):
+    if not created or raw:
+        return
+    AuthorStats.change_followers_count(instance.author_id, 1)
+    if timelines.is_fanned_out(instance.author_id):
+        enqueue(
+            'posts.backfill_timeline',
+            reader_id=instance.user_id,
+            author_id=instance.author_id,
+        )
+    invalidate_feeds(f'profile:{instance.author.username}')
+
+
+@receiver(post_delete, sender=Follow)
+def apply_unfollow(sender, instance, **kwargs):
+    AuthorStats.change_followers_count(instance.author_id, -1)
+    timelines.remove_author(instance.user_id, instance.author_id)
+    invalidate_feeds(f'profile:{instance.author.username}')
+
+
+# Подключаются последними: предыдущие обработчики сравнивают
+# исходные значения с новыми.
+@receiver(post_save, sender=Post)
+def remember_saved_post(sender, instance, **kwargs):
+    instance._original_author_id = instance.author_id
+    instance._original_group_id = instance.group_id
+    instance._original_image = image_name(instance)
+
+
+@receiver(post_save, sender=User)
+def remember_saved_author_names(sender, instance, **kwargs):
+    remember_author_names(sender, instance)
+
+
+@receiver(post_save, sender=Group)
+def remember_saved_slug(sender, instance, **kwargs):
+    instance._original_slug = instance.slug
@@ -0,0 +1,43 @@
+from jobs.queue import task
+
+from . import search, thumbnails, timelines
+from .models import Follow, Post
+
+
+@task('posts.reindex_posts', batch=True)
+def reindex_posts(payloads):
+    """Обновляет поисковый индекс постов; удалённые посты убирает."""
+    post_ids = {kwargs['post_id'] for kwargs in payloads}
+    posts = Post.objects.filter(pk__in=post_ids).only('pk', 'text')
+    for post in posts:
+        search.index_post(post)
+        post_ids.discard(post.pk)
+    for post_id in post_ids:
+        search.remove_post(post_id)
+
+
+@task('posts.fan_out_posts', batch=True)
+def fan_out_posts(payloads):
+    timelines.fan_out(Post.objects.filter(
+        pk__in={kwargs['post_id'] for kwargs in payloads}
+    ).values_list('pk', 'author_id'))
+
+
+@task('posts.backfill_timeline')
+def backfill_timeline(reader_id, author_id):
+    """Пропускается, если читатель уже отписался."""
+    if Follow.objects.filter(user_id=reader_id, author_id=author_id).exists():
+        timelines.backfill(reader_id, author_id)
+
+
+@task('posts.make_thumbnails')
+def make_thumbnails(post_id):
+    """Создаёт миниатюры картинки поста. Сохранение поста меняет
+    версию его карточки, и ленты начинают показывать миниатюру."""
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    thumbnails.generate(post.image)
+    if not post.thumbnails_ready:
+        post.thumbnails_ready = True
+        post.save(update_fields=('thumbnails_ready', 'updated'))
@@ -0,0 +1,23 @@
+from django import template
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from .. import thumbnails
+from ..cache import get_post_card
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_card(post, variant):
+    """Карточка поста в ленте, отрисованная один раз для всех зрителей."""
+    return mark_safe(get_post_card(post, variant, lambda: render_to_string(
+        'posts/includes/post_card.html', {'post': post, 'variant': variant}
+    )))
+
+
+@register.simple_tag
+def post_thumbnail(post, size):
+    """Готовая миниатюра картинки поста или None. Миниатюры создаёт
+    фоновая задача, отрисовка страницы их никогда не генерирует."""
+    return thumbnails.cached(post, size)
@@ -0,0 +1,159 @@
+import warnings
+
+from django.core.cache import CacheKeyWarning, cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..cache import post_card_counters
+from ..models import Group, Post, User
+
+USERNAME = 'user'
+SLUG = 'slug-one'
+
+INDEX_URL = reverse('posts:index')
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username=USERNAME, first_name='Имя', last_name='Фамилия'
+        )
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=SLUG,
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        post_card_counters.clear()
+        self.guest = Client()
+        self.another = Client()
+        self.another.force_login(self.user)
+
+    def test_card_rendered_once(self):
+        """Повторный показ ленты берёт карточку поста из кэша."""
+        self.another.get(INDEX_URL)
+        self.another.get(INDEX_URL)
+        self.assertEqual(post_card_counters['misses'], 1)
+        self.assertEqual(post_card_counters['hits'], 1)
+
+    def test_card_invalidated_on_changes(self):
+        """Карточка обновляется при правке поста, группы и автора."""
+        self.guest.get(INDEX_URL)
+        self.post.text = 'Новый текст поста'
+        self.post.save()
+        self.assertContains(self.guest.get(INDEX_URL), 'Новый текст поста')
+        self.group.title = 'Новое название группы'
+        self.group.save()
+        self.assertContains(
+            self.guest.get(INDEX_URL), 'Новое название группы'
+        )
+        self.user.first_name = 'Другое'
+        self.user.save()
+        self.assertContains(self.guest.get(INDEX_URL), 'Другое Фамилия')
+
+    def test_card_kept_when_names_unchanged(self):
+        """Вход и смена пароля автора не сбрасывают его карточки."""
+        self.guest.get(INDEX_URL)
+        author = User.objects.get(pk=self.user.pk)
+        author.set_password('new-Passw0rd!')
+        author.save()
+        author.last_login = timezone.now()
+        author.save(update_fields=['last_login'])
+        self.guest.get(INDEX_URL)
+        self.assertEqual(post_card_counters['misses'], 1)
+
+
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=SLUG,
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Тестовый пост',
+            group=cls.group,
+        )
+        cls.GROUP_LIST_URL = reverse('posts:group_list', args=[SLUG])
+        cls.PROFILE_URL = reverse('posts:profile', args=[USERNAME])
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.guest = Client()
+        self.another = Client()
+        self.another.force_login(self.user)
+
+    def test_anonymous_page_served_from_cache(self):
+        """Повторный анонимный запрос ленты не обращается к базе."""
+        for url in [INDEX_URL, self.GROUP_LIST_URL, self.PROFILE_URL]:
+            with self.subTest(url=url):
+                content = self.guest.get(url).content
+                with self.assertNumQueries(0):
+                    response = self.guest.get(url)
+                self.assertEqual(response.content, content)
+
+    def test_authenticated_header_not_leaked(self):
+        """Авторизованный пользователь не получает и не кэширует
+        анонимную страницу."""
+        self.another.get(INDEX_URL)
+        self.assertNotContains(self.guest.get(INDEX_URL), 'Выйти')
+        self.assertContains(self.another.get(INDEX_URL), 'Выйти')
+
+    def test_post_edit_invalidates_feeds(self):
+        """Правка поста сбрасывает кэш лент, где он показан."""
+        for url in [INDEX_URL, self.GROUP_LIST_URL, self.PROFILE_URL]:
+            self.guest.get(url)
+        self.another.post(
+            reverse('posts:post_edit', args=[self.post.id]),
+            data={'text': 'Изменённый пост', 'group': self.group.id},
+        )
+        for url in [INDEX_URL, self.GROUP_LIST_URL, self.PROFILE_URL]:
+            with self.subTest(url=url):
+                self.assertContains(self.guest.get(url), 'Изменённый пост')
+
+    def test_rename_invalidates_old_profile(self):
+        """После переименования автора страница профиля по старому
+        имени не отдаётся из кэша."""
+        self.assertEqual(self.guest.get(self.PROFILE_URL).status_code, 200)
+        author = User.objects.get(pk=self.user.pk)
+        author.username = 'renamed'
+        author.save()
+        self.assertEqual(self.guest.get(self.PROFILE_URL).status_code, 404)
+
+    def test_signup_and_password_change_keep_feeds(self):
+        """Регистрация и смена пароля не сбрасывают кэш лент."""
+        for url in [INDEX_URL, self.GROUP_LIST_URL, self.PROFILE_URL]:
+            self.guest.get(url)
+        User.objects.create_user(username='newcomer')
+        author = User.objects.get(pk=self.user.pk)
+        author.set_password('new-Passw0rd!')
+        author.save()
+        for url in [INDEX_URL, self.GROUP_LIST_URL, self.PROFILE_URL]:
+            with self.subTest(url=url):
+                with self.assertNumQueries(0):
+                    self.guest.get(url)
+
+    def test_keys_valid_for_any_input(self):
+        """Ключи кэша не зависят от длины и символов пути и запроса."""
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter('always', CacheKeyWarning)
+            self.guest.get(INDEX_URL, {'page': 'страница ' * 50})
+            self.guest.get(self.GROUP_LIST_URL)
+        self.assertFalse([
+            warning for warning in caught
+            if issubclass(warning.category, CacheKeyWarning)
+        ])
@@ -0,0 +1,95 @@
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Group, Post, User
+
+INDEX_URL = reverse('posts:index')
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description=''
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.guest = Client()
+        self.authorized = Client()
+        self.authorized.force_login(self.user)
+        self.post = Post.objects.create(
+            author=self.user, text='Текст', group=self.group
+        )
+
+    def test_unchanged_feeds_return_304(self):
+        """Повторный запрос с ETag неизменной страницы получает 304."""
+        for url in (
+            INDEX_URL,
+            reverse('posts:group_list', args=[self.group.slug]),
+            reverse('posts:profile', args=[self.user.username]),
+            reverse('posts:post_detail', args=[self.post.pk]),
+        ):
+            with self.subTest(url=url):
+                response = self.guest.get(url)
+                self.assertTrue(response.has_header('Last-Modified'))
+                repeat = self.guest.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(repeat.status_code, 304)
+
+    def test_changes_refresh_validators(self):
+        """Новый пост и правка поста меняют ETag и Last-Modified."""
+        etag = self.guest.get(INDEX_URL)['ETag']
+        Post.objects.create(author=self.user, text='Новый пост')
+        response = self.guest.get(INDEX_URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        url = reverse('posts:post_detail', args=[self.post.pk])
+        Post.objects.filter(pk=self.post.pk).update(
+            updated=self.post.updated.replace(year=2000)
+        )
+        modified = self.guest.get(url)['Last-Modified']
+        self.assertEqual(
+            self.guest.get(url, HTTP_IF_MODIFIED_SINCE=modified).status_code,
+            304,
+        )
+        self.authorized.post(
+            reverse('posts:post_edit', args=[self.post.pk]),
+            data={'text': 'Исправленный текст'},
+        )
+        self.assertEqual(
+            self.guest.get(url, HTTP_IF_MODIFIED_SINCE=modified).status_code,
+            200,
+        )
+
+    def test_validators_depend_on_user(self):
+        """Авторизованный пользователь получает свой ETag
+        и не получает Last-Modified."""
+        anonymous = self.guest.get(INDEX_URL)
+        response = self.authorized.get(INDEX_URL)
+        self.assertNotEqual(response['ETag'], anonymous['ETag'])
+        self.assertFalse(response.has_header('Last-Modified'))
+        self.assertEqual(self.authorized.get(
+            INDEX_URL, HTTP_IF_NONE_MATCH=anonymous['ETag']
+        ).status_code, 200)
+
+    def test_renames_refresh_other_feeds(self):
+        """Переименование автора меняет ETag лент его групп,
+        переименование группы - ETag профилей её авторов."""
+        group_url = reverse('posts:group_list', args=[self.group.slug])
+        profile_url = reverse('posts:profile', args=[self.user.username])
+        for url, instance, field in (
+            (group_url, self.user, 'first_name'),
+            (profile_url, self.group, 'title'),
+        ):
+            with self.subTest(url=url):
+                etag = self.guest.get(url)['ETag']
+                setattr(instance, field, 'Новое имя')
+                instance.save()
+                self.assertEqual(
+                    self.guest.get(url, HTTP_IF_NONE_MATCH=etag).status_code,
+                    200,
+                )
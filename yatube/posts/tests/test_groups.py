@@ -0,0 +1,68 @@
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..groups import attach_groups, get_group_or_404, group_directory
+from ..models import Group, Post, User
+
+GROUP_INDEX_URL = reverse('posts:group_index')
+
+
+class GroupCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.guest = Client()
+        self.group = Group.objects.create(
+            title='Коты', slug='cats', description='Про котов'
+        )
+
+    def test_group_lookup_is_cached(self):
+        """Группа по slug берётся из кэша и обновляется при правке."""
+        get_group_or_404('cats')
+        with self.assertNumQueries(0):
+            self.assertEqual(get_group_or_404('cats').title, 'Коты')
+        self.group.title = 'Кошки'
+        self.group.save()
+        self.assertEqual(get_group_or_404('cats').title, 'Кошки')
+        self.group.delete()
+        response = self.guest.get(
+            reverse('posts:group_list', args=['cats'])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    @override_settings(GROUP_LOCAL_TIMEOUT=0)
+    def test_change_from_other_process_expires(self):
+        """Правка группы, об инвалидации которой процесс не узнал
+        (LocMemCache в другом процессе), видна через
+        GROUP_LOCAL_TIMEOUT."""
+        get_group_or_404('cats')
+        Group.objects.filter(pk=self.group.pk).update(title='Кошки')
+        self.assertEqual(get_group_or_404('cats').title, 'Кошки')
+
+    def test_feed_uses_cached_group(self):
+        """Лента подставляет группы постов страницы из кэша групп."""
+        Post.objects.create(author=self.user, text='Пост', group=self.group)
+        [post] = attach_groups([Post.objects.for_feed().get()])
+        with self.assertNumQueries(0):
+            self.assertEqual(post.group.title, 'Коты')
+
+    def test_group_directory(self):
+        """Каталог групп показывает число постов и дату последнего."""
+        Group.objects.create(title='Собаки', slug='dogs', description='')
+        post = Post.objects.create(
+            author=self.user, text='Пост', group=self.group
+        )
+        response = self.guest.get(GROUP_INDEX_URL)
+        self.assertTemplateUsed(response, 'posts/group_index.html')
+        cats, dogs = response.context['groups']
+        self.assertEqual((cats.posts_count, dogs.posts_count), (1, 0))
+        self.assertEqual(cats.last_pub_date, post.pub_date)
+        with self.assertNumQueries(0):
+            group_directory()
+        Post.objects.create(author=self.user, text='Ещё', group=self.group)
+        self.assertEqual(group_directory()[0].posts_count, 2)
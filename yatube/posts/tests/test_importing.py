@@ -0,0 +1,124 @@
+import json
+import os
+import tempfile
+from io import StringIO
+from unittest import mock
+
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from ..models import AuthorStats, Group, Post, User
+
+
+class ImportPostsCommandTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='slug-one',
+            description='Тестовое описание',
+        )
+
+    def setUp(self) -> None:
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as output:
+            output.write(content)
+        return path
+
+    def test_import_jsonl_in_chunks(self):
+        """Посты импортируются порциями с датами, авторами и группами."""
+        records = [
+            {'text': f'Пост {i}', 'author': 'user', 'group': 'slug-one',
+             'pub_date': f'2020-01-0{i + 1}T10:00:00+00:00'}
+            for i in range(5)
+        ] + [{'text': 'Без автора', 'author': 'nobody'}]
+        path = self.write('posts.jsonl', '\n'.join(
+            json.dumps(record, ensure_ascii=False) for record in records
+        ))
+        call_command(
+            'import_posts', path, chunk_size=2, stdout=StringIO(),
+            stderr=StringIO(),
+        )
+        posts = Post.objects.filter(author=self.user)
+        self.assertEqual(posts.count(), 5)
+        self.assertEqual(posts.filter(group=self.group).count(), 5)
+        self.assertEqual(
+            sorted(post.pub_date.day for post in posts), [1, 2, 3, 4, 5]
+        )
+        self.assertTrue(Post._meta.get_field('pub_date').auto_now_add)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.user).posts_count, 5
+        )
+        with open(f'{path}.state') as state:
+            self.assertEqual(state.read(), '6')
+
+    def test_import_csv_resume_and_create_missing(self):
+        """CSV импорт продолжается с сохранённой позиции и создаёт
+        недостающих авторов."""
+        path = self.write(
+            'posts.csv',
+            'text,author,group\nПервый,user,\nВторой,new_author,\n'
+        )
+        self.write('posts.csv.state', '1')
+        call_command(
+            'import_posts', path, resume=True, create_missing=True,
+            stdout=StringIO(),
+        )
+        self.assertEqual(
+            list(Post.objects.values_list('text', 'author__username')),
+            [('Второй', 'new_author')],
+        )
+
+    def test_bad_rows_reported_with_line_numbers(self):
+        """Неразборчивые записи пропускаются с номером строки,
+        остальные импортируются, пост без даты получает текущую."""
+        path = self.write('posts.jsonl', '\n'.join([
+            json.dumps({'text': 'Без даты', 'author': 'user'}),
+            '{"text": "обрыв',
+            json.dumps({'text': 'Дата', 'author': 'user',
+                        'pub_date': '2020-13-45T10:00:00'}),
+            json.dumps(['не', 'объект']),
+            json.dumps({'text': 'Автор', 'author': ['user']}),
+            json.dumps({'text': 'С датой', 'author': 'user',
+                        'pub_date': '2020-02-01T10:00:00+00:00'}),
+        ]))
+        errors = StringIO()
+        call_command('import_posts', path, stdout=StringIO(), stderr=errors)
+        self.assertEqual(
+            [line.split(':')[0] for line in errors.getvalue().splitlines()],
+            [f'Строка {line} пропущена' for line in (2, 3, 4, 5)],
+        )
+        self.assertEqual(
+            Post.objects.get(text='С датой').pub_date.month, 2
+        )
+        self.assertEqual(
+            Post.objects.get(text='Без даты').pub_date.year,
+            timezone.now().year,
+        )
+
+    def test_concurrent_insert_rolls_back_chunk(self):
+        """Чужой пост, вставленный вместе с порцией, не получает дату
+        из файла: порция откатывается, а не сопоставляется по позиции."""
+        path = self.write('posts.jsonl', json.dumps(
+            {'text': 'Импорт', 'author': 'user',
+             'pub_date': '2020-01-01T10:00:00+00:00'}
+        ))
+        bulk_create = Post.objects.bulk_create
+
+        def concurrent_bulk_create(posts, **kwargs):
+            Post.objects.create(text='Чужой', author=self.user)
+            return bulk_create(posts, **kwargs)
+
+        with self.assertRaises(CommandError):
+            with mock.patch.object(
+                Post.objects, 'bulk_create', concurrent_bulk_create
+            ):
+                call_command('import_posts', path, stdout=StringIO())
+        self.assertFalse(Post.objects.exists())
@@ -1,7 +1,10 @@
+from io import StringIO
+
 from django.conf import settings
-from django.test import TestCase
+from django.core.management import call_command
+from django.test import TestCase, override_settings
 
-from ..models import Group, Post, User
+from ..models import AuthorStats, Group, Post, User
 
 
 class PostModelTest(TestCase):
@@ -53,3 +56,100 @@ class PostModelTest(TestCase):
                     Post._meta.get_field(field).help_text,
                     expected_value
                 )
+
+
+@override_settings(POST_EXCERPT_LENGTH=20)
+class PostTextHtmlTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='auth')
+
+    def test_html_rendered_on_save(self):
+        """HTML текста и его начала сохраняются вместе с текстом,
+        разметка экранируется и не обрезается."""
+        post = Post.objects.create(
+            author=self.author,
+            text='Первый <b>абзац</b> текста\n\nВторой абзац текста',
+        )
+        self.assertEqual(post.text_html, (
+            '<p>Первый &lt;b&gt;абзац&lt;/b&gt; текста</p>\n\n'
+            '<p>Второй абзац текста</p>'
+        ))
+        self.assertEqual(
+            post.excerpt_html, '<p>Первый &lt;b&gt;абзац&lt;/b&gt;…</p>'
+        )
+        post.text = 'Новый текст'
+        post.save(update_fields=('text',))
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<p>Новый текст</p>')
+
+    def test_render_post_text_fills_missing(self):
+        """Команда заполняет HTML постов, сохранённых без него."""
+        post = Post.objects.create(author=self.author, text='Текст')
+        Post.objects.filter(pk=post.pk).update(text_html='', excerpt_html='')
+        call_command('render_post_text', batch_size=1, stdout=StringIO())
+        post.refresh_from_db()
+        self.assertEqual(post.text_html, '<p>Текст</p>')
+        self.assertEqual(post.excerpt_html, '<p>Текст</p>')
+
+    def test_feed_reads_only_card_html(self):
+        """Лента не читает исходный текст и HTML, который её карточка
+        не выводит."""
+        Post.objects.create(author=self.author, text='Текст')
+        for variant, deferred in (
+            ('index', {'text', 'excerpt_html'}),
+            ('profile', {'text', 'text_html'}),
+        ):
+            with self.subTest(variant=variant):
+                post = Post.objects.for_feed(variant).get()
+                self.assertTrue(
+                    deferred <= post.get_deferred_fields()
+                )
+                self.assertFalse(
+                    {'text_html', 'excerpt_html'} - deferred
+                    & post.get_deferred_fields()
+                )
+
+
+class AuthorStatsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.another = User.objects.create_user(username='another')
+
+    def posts_count(self, user):
+        return AuthorStats.objects.get(author=user).posts_count
+
+    def test_posts_count_follows_create_edit_delete(self):
+        """Счётчик постов автора меняется при создании, смене
+        автора и удалении поста."""
+        post = Post.objects.create(author=self.user, text='Первый')
+        Post.objects.create(author=self.user, text='Второй')
+        self.assertEqual(self.posts_count(self.user), 2)
+        post.author = self.another
+        post.save()
+        self.assertEqual(self.posts_count(self.user), 1)
+        self.assertEqual(self.posts_count(self.another), 1)
+        post.delete()
+        self.assertEqual(self.posts_count(self.another), 0)
+
+    def test_delete_with_zero_counter(self):
+        """Удаление поста, не учтённого в счётчике, не делает его
+        отрицательным."""
+        AuthorStats.objects.create(author=self.user)
+        Post.objects.bulk_create([Post(author=self.user, text='Пост')])
+        Post.objects.get(author=self.user).delete()
+        self.assertEqual(self.posts_count(self.user), 0)
+
+    def test_rebuild_restores_counts(self):
+        """Пересчёт восстанавливает счётчики после bulk_create."""
+        Post.objects.bulk_create(
+            Post(author=self.user, text=f'Пост {i}') for i in range(3)
+        )
+        AuthorStats.rebuild()
+        self.assertEqual(self.posts_count(self.user), 3)
+        self.assertFalse(AuthorStats.objects.filter(
+            author=self.another
+        ).exists())
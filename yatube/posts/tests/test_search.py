@@ -0,0 +1,124 @@
+from unittest import mock
+
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import search
+from ..models import Post, SearchToken, User
+
+SEARCH_URL = reverse('posts:search')
+
+
+@override_settings(JOBS_EAGER=True)
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='user')
+
+    def setUp(self) -> None:
+        self.guest = Client()
+        self.cats = Post.objects.create(
+            author=self.user, text='Кошки спят. Кошка спит на диване.'
+        )
+        self.dog = Post.objects.create(
+            author=self.user, text='Собака и кошка гуляют во дворе.'
+        )
+        Post.objects.create(author=self.user, text='Погода хорошая')
+
+    def test_tokenize_normalizes_word_forms(self):
+        """Разные формы слова дают одну основу."""
+        self.assertEqual(
+            search.tokenize('Кошки, кошкой, КОШКА!'),
+            ['кошк', 'кошк', 'кошк'],
+        )
+        self.assertEqual(search.tokenize('ёлка'), search.tokenize('елки'))
+
+    def check_search(self):
+        self.assertEqual(search.search('кошками'), [self.cats.pk, self.dog.pk])
+        self.assertEqual(search.search('кошка собаки'), [self.dog.pk])
+        self.assertEqual(search.search('жираф'), [])
+        self.dog.delete()
+        self.assertEqual(search.search('собака'), [])
+        self.cats.text = 'Теперь здесь про собак'
+        self.cats.save()
+        self.assertEqual(search.search('собака'), [self.cats.pk])
+
+    def test_search_with_default_backend(self):
+        """Поиск находит формы слов, ранжирует и следит за правками."""
+        self.check_search()
+
+    def test_search_with_token_index(self):
+        """То же для индекса на модели SearchToken."""
+        with mock.patch.object(search, 'use_fts', return_value=False):
+            search.rebuild()
+            self.check_search()
+
+    def test_token_index_reuses_post_count(self):
+        """Число постов для idf считается раз на поколение главной
+        ленты, а не при каждом поиске."""
+        with mock.patch.object(search, 'use_fts', return_value=False):
+            search.rebuild()
+            search.search('кошка')
+            with self.assertNumQueries(2):
+                self.assertEqual(
+                    search.search('собака'), [self.dog.pk]
+                )
+            Post.objects.create(author=self.user, text='Собака спит')
+            with self.assertNumQueries(3):
+                self.assertEqual(len(search.search('собака')), 2)
+
+    def test_search_page(self):
+        """Страница поиска показывает найденные посты."""
+        response = self.guest.get(SEARCH_URL, {'q': 'собаку'})
+        self.assertTemplateUsed(response, 'posts/search.html')
+        self.assertEqual(list(response.context['page_obj']), [self.dog])
+
+    def check_matching_posts(self):
+        long_word = 'ы' * 100
+        post = Post.objects.create(author=self.user, text=f'Кошка {long_word}')
+        search.index_post(post)
+        self.assertEqual(
+            set(Post.objects.filter(
+                pk__in=search.matching_posts('кошка')
+            ).values_list('pk', flat=True)),
+            {self.cats.pk, self.dog.pk, post.pk},
+        )
+        self.assertEqual(
+            list(Post.objects.filter(
+                pk__in=search.matching_posts(long_word)
+            )),
+            [post],
+        )
+        self.assertEqual(search.search(long_word), [post.pk])
+
+    @override_settings(SEARCH_RESULTS_LIMIT=1)
+    def test_matching_posts_not_limited(self):
+        """Подзапрос для админки находит все посты, а не только
+        SEARCH_RESULTS_LIMIT лучших."""
+        self.check_matching_posts()
+
+    @override_settings(SEARCH_RESULTS_LIMIT=1)
+    def test_matching_posts_with_token_index(self):
+        """То же для индекса SearchToken, где основы обрезаются."""
+        with mock.patch.object(search, 'use_fts', return_value=False):
+            search.rebuild()
+            self.check_matching_posts()
+            self.assertTrue(SearchToken.objects.filter(
+                token='ы' * search.TOKEN_LENGTH
+            ).exists())
+
+    def test_admin_search_uses_index(self):
+        """Поиск в админке ищет по индексу все подходящие посты."""
+        admin = Client()
+        admin.force_login(User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'
+        ))
+        with override_settings(SEARCH_RESULTS_LIMIT=1):
+            response = admin.get(
+                reverse('admin:posts_post_changelist'), {'q': 'кошками'}
+            )
+        self.assertEqual(
+            set(response.context['cl'].result_list),
+            {self.cats, self.dog},
+        )
@@ -0,0 +1,112 @@
+import io
+import os
+import shutil
+import tempfile
+
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from jobs.models import Job
+from jobs.worker import Worker
+
+from .. import thumbnails
+from ..models import Post, User
+
+USERNAME = 'author'
+MEDIA_ROOT = tempfile.mkdtemp()
+INDEX_URL = reverse('posts:index')
+POST_CREATE_URL = reverse('posts:post_create')
+
+
+def image_file(name='photo.png', color='red'):
+    content = io.BytesIO()
+    Image.new('RGB', (1200, 800), color).save(content, 'PNG')
+    return SimpleUploadedFile(name, content.getvalue(), 'image/png')
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, JOBS_EAGER=False)
+class ThumbnailTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+
+    @classmethod
+    def tearDownClass(cls) -> None:
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        super().tearDownClass()
+
+    def setUp(self) -> None:
+        cache.clear()
+        shutil.rmtree(os.path.join(MEDIA_ROOT, 'cache'), ignore_errors=True)
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def create_post(self):
+        self.client.post(POST_CREATE_URL, {
+            'text': 'Пост с картинкой', 'image': image_file(),
+        })
+        return Post.objects.get(author=self.user)
+
+    def thumbnail_files(self):
+        return [
+            name for _, _, names in os.walk(os.path.join(MEDIA_ROOT, 'cache'))
+            for name in names
+        ]
+
+    def test_feed_never_generates_thumbnails(self):
+        """Пока задача не выполнена, лента показывает исходную картинку
+        и не создаёт миниатюр."""
+        post = self.create_post()
+        self.assertFalse(post.thumbnails_ready)
+        self.assertTrue(Job.objects.filter(
+            name='posts.make_thumbnails', payload__contains=str(post.pk)
+        ).exists())
+        response = Client().get(INDEX_URL)
+        self.assertContains(response, post.image.url)
+        self.assertEqual(self.thumbnail_files(), [])
+        self.assertIsNone(thumbnails.backend.get_cached_thumbnail(
+            post.image, '960x339', crop='center', upscale=True
+        ))
+
+    def test_worker_creates_thumbnails(self):
+        """Исполнитель создаёт миниатюры всех размеров, после чего
+        лента и страница поста ссылаются на них."""
+        post = self.create_post()
+        Worker(threads=1).run(once=True)
+        post.refresh_from_db()
+        self.assertTrue(post.thumbnails_ready)
+        self.assertEqual(len(self.thumbnail_files()), 2)
+        feed = thumbnails.cached(post, 'feed')
+        self.assertEqual((feed.width, feed.height), (960, 339))
+        self.assertEqual(
+            feed.url,
+            thumbnails.backend.get_thumbnail(
+                post.image, '960x339', crop='center', upscale=True
+            ).url,
+        )
+        self.assertContains(Client().get(INDEX_URL), feed.url)
+        self.assertContains(
+            self.client.get(reverse('posts:post_detail', args=[post.pk])),
+            thumbnails.cached(post, 'detail').url,
+        )
+
+    def test_new_image_replaces_thumbnails(self):
+        """Смена картинки сбрасывает готовность и удаляет старые
+        миниатюры, правка текста задачу не ставит."""
+        post = self.create_post()
+        Worker(threads=1).run(once=True)
+        edit_url = reverse('posts:post_edit', args=[post.pk])
+        self.client.post(edit_url, {'text': 'Новый текст'})
+        jobs = Job.objects.filter(name='posts.make_thumbnails')
+        self.assertFalse(jobs.exists())
+        self.client.post(edit_url, {
+            'text': 'Новый текст', 'image': image_file('new.png', 'blue'),
+        })
+        post.refresh_from_db()
+        self.assertFalse(post.thumbnails_ready)
+        self.assertEqual(self.thumbnail_files(), [])
+        self.assertEqual(jobs.count(), 1)
@@ -0,0 +1,141 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from .. import timelines
+from ..models import AuthorStats, Follow, Post, TimelineEntry, User
+
+FOLLOW_INDEX_URL = reverse('posts:follow_index')
+
+
+@override_settings(JOBS_EAGER=True)
+class TimelineTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+
+    def setUp(self) -> None:
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def timeline(self):
+        return list(
+            self.client.get(FOLLOW_INDEX_URL).context['page_obj']
+        )
+
+    def test_follow_and_unfollow(self):
+        """Подписка ведёт счётчик, добавляет старые посты и отписка
+        их убирает."""
+        old = Post.objects.create(author=self.author, text='Старый пост')
+        self.client.get(
+            reverse('posts:profile_follow', args=[self.author.username])
+        )
+        self.client.get(
+            reverse('posts:profile_follow', args=[self.reader.username])
+        )
+        self.assertEqual(Follow.objects.count(), 1)
+        self.assertEqual(self.author.stats.followers_count, 1)
+        self.assertEqual(self.timeline(), [old])
+        self.client.get(
+            reverse('posts:profile_unfollow', args=[self.author.username])
+        )
+        self.assertEqual(Follow.objects.count(), 0)
+        self.assertEqual(
+            AuthorStats.objects.get(author=self.author).followers_count, 0
+        )
+        self.assertEqual(self.timeline(), [])
+
+    def test_new_post_fans_out_to_followers(self):
+        """Новый пост попадает в ленты подписчиков и автора."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Новый пост')
+        Post.objects.create(author=self.stranger, text='Чужой пост')
+        self.assertEqual(self.timeline(), [post])
+        self.assertTrue(TimelineEntry.objects.filter(
+            reader=self.author, post=post
+        ).exists())
+
+    @override_settings(TIMELINE_MAX_LENGTH=3)
+    def test_timeline_is_capped(self):
+        """Лента хранит не больше TIMELINE_MAX_LENGTH новых постов."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        posts = [
+            Post.objects.create(author=self.author, text=f'Пост {number}')
+            for number in range(5)
+        ]
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(
+                reader=self.reader
+            ).values_list('post', flat=True)),
+            {post.pk for post in posts[2:]},
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_popular_author_is_merged_on_read(self):
+        """Посты популярных авторов подмешиваются при чтении."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Для всех')
+        self.assertFalse(TimelineEntry.objects.filter(
+            reader=self.reader
+        ).exists())
+        self.assertEqual(self.timeline(), [post])
+
+    def test_rebuild_command(self):
+        """Команда пересобирает ленты из подписок."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        post = Post.objects.create(author=self.author, text='Пост')
+        TimelineEntry.objects.all().delete()
+        call_command('rebuild_timelines', stdout=StringIO())
+        self.assertEqual(
+            list(timelines.TimelinePaginator(self.reader, 10).page(None)),
+            [post],
+        )
+
+    @override_settings(TIMELINE_FANOUT_LIMIT=0)
+    def test_pages_merge_entries_and_popular_authors(self):
+        """Страницы ленты по курсору сливают записи ленты и посты
+        популярного автора в порядке даты, без повторов."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        posts = []
+        for number in range(5):
+            posts.append(
+                Post.objects.create(author=self.reader, text=f'Свой {number}')
+            )
+            posts.append(
+                Post.objects.create(author=self.author, text=f'Его {number}')
+            )
+        paginator = timelines.TimelinePaginator(self.reader, 4)
+        page = paginator.page(None)
+        shown = list(page)
+        while page.has_next():
+            page = paginator.page(page.next_cursor)
+            shown.extend(page)
+        self.assertEqual(shown, posts[::-1])
+        back = paginator.page(page.previous_cursor)
+        self.assertEqual(list(back), posts[::-1][4:8])
+
+    @override_settings(TIMELINE_MAX_LENGTH=2)
+    def test_trim_keeps_newest_by_pub_date(self):
+        """Обрезка оставляет самые новые по дате посты, даже если
+        старый пост добавлен позже."""
+        Follow.objects.create(user=self.reader, author=self.author)
+        new = [
+            Post.objects.create(author=self.author, text=f'Новый {number}')
+            for number in range(2)
+        ]
+        old = Post.objects.create(author=self.author, text='Старый')
+        Post.objects.filter(pk=old.pk).update(
+            pub_date=new[0].pub_date.replace(year=2000)
+        )
+        timelines.backfill(self.reader.pk, self.author.pk)
+        self.assertEqual(
+            set(TimelineEntry.objects.filter(
+                reader=self.reader
+            ).values_list('post', flat=True)),
+            {post.pk for post in new},
+        )
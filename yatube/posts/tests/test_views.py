@@ -1,8 +1,13 @@
 from django.conf import settings
-from django.test import Client, TestCase
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 
+from ..groups import groups_by_id
 from ..models import Group, Post, User
+from ..paginators import FeedPaginator
 
 
 USERNAME = 'user'
@@ -131,3 +136,160 @@ class PaginatorViewsTest(TestCase):
                     len(self.another.get(url).context['page_obj']),
                     posts_count
                 )
+
+
+class FeedPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Пост {i}') for i in range(25)
+        )
+
+    def test_known_count_skips_count_query(self):
+        """С известным числом постов COUNT(*) не выполняется,
+        а следующая страница определяется по лишней строке."""
+        paginator = FeedPaginator(Post.objects.all(), 10, count=25)
+        with CaptureQueriesContext(connection) as queries:
+            page = paginator.get_page(2)
+        self.assertEqual(len(queries), 1)
+        self.assertNotIn('COUNT(', queries[0]['sql'])
+        self.assertEqual(len(page), 10)
+        self.assertTrue(page.has_next())
+        self.assertFalse(paginator.get_page(3).has_next())
+
+    def test_stale_count_is_recounted(self):
+        """Устаревшее число не прячет существующие страницы."""
+        page = FeedPaginator(Post.objects.all(), 10, count=5).get_page(3)
+        self.assertEqual(page.number, 3)
+        self.assertEqual(len(page), 5)
+
+    def test_overstated_count_is_recounted(self):
+        """Завышенное число не даёт пустую страницу: после пересчёта
+        открывается последняя существующая."""
+        paginator = FeedPaginator(Post.objects.all(), 10, count=45)
+        page = paginator.get_page(5)
+        self.assertEqual(page.number, 3)
+        self.assertEqual(len(page), 5)
+        self.assertEqual(paginator.num_pages, 3)
+
+    def test_elided_page_range(self):
+        """Диапазон страниц сокращается до краёв и окна вокруг текущей."""
+        paginator = FeedPaginator(range(1000), 10)
+        ellipsis = FeedPaginator.ELLIPSIS
+        self.assertEqual(
+            list(paginator.get_elided_page_range(50)),
+            [1, ellipsis, 48, 49, 50, 51, 52, ellipsis, 100],
+        )
+        self.assertEqual(
+            list(paginator.get_elided_page_range(2)),
+            [1, 2, 3, 4, ellipsis, 100],
+        )
+        self.assertEqual(
+            list(FeedPaginator(range(30), 10).get_elided_page_range(1)),
+            [1, 2, 3],
+        )
+
+
+@override_settings(FEED_PAGINATION='cursor')
+class CursorPaginatorViewsTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug=SLUG_TEST,
+            description='Тестовое описание',
+        )
+        Post.objects.bulk_create(
+            Post(
+                author=cls.user,
+                text=f'Тестовый текст {i}-го поста',
+                group=cls.group
+            ) for i in range(settings.LIMIT_OF_POSTS + 1)
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.guest = Client()
+
+    def test_cursor_pages_walk_forward_and_back(self):
+        """Курсоры ведут на следующую и обратно на предыдущую страницу."""
+        for url in [INDEX_URL, GROUP_LIST_URL_3, PROFILE_URL]:
+            with self.subTest(url=url):
+                first = self.guest.get(url).context['page_obj']
+                self.assertEqual(len(first), settings.LIMIT_OF_POSTS)
+                self.assertFalse(first.has_previous())
+                second = self.guest.get(
+                    url, {'cursor': first.next_cursor}
+                ).context['page_obj']
+                self.assertEqual(len(second), 1)
+                self.assertFalse(second.has_next())
+                back = self.guest.get(
+                    url, {'cursor': second.previous_cursor}
+                ).context['page_obj']
+                self.assertEqual(list(back), list(first))
+
+    def test_cursor_page_does_not_count(self):
+        """Ленты по курсору, включая первую страницу, выбираются
+        без COUNT и OFFSET."""
+        with CaptureQueriesContext(connection) as queries:
+            cursor = self.guest.get(INDEX_URL).context['page_obj'].next_cursor
+            self.guest.get(INDEX_URL, {'cursor': cursor})
+            self.guest.get(GROUP_LIST_URL_3)
+        for query in queries.captured_queries:
+            self.assertNotIn('COUNT(', query['sql'])
+            self.assertNotIn('OFFSET', query['sql'])
+
+    def test_invalid_cursor_returns_first_page(self):
+        """Неверный курсор открывает первую страницу."""
+        page_obj = self.guest.get(
+            INDEX_URL, {'cursor': 'broken'}
+        ).context['page_obj']
+        self.assertEqual(len(page_obj), settings.LIMIT_OF_POSTS)
+
+
+class FeedQueriesTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(username=USERNAME)
+        cls.another_user = User.objects.create_user(username=TEST_USER)
+        cls.group = Group.objects.create(
+            title='Тестовая группа 1',
+            slug=SLUG_1,
+            description='Тестовое описание 1',
+        )
+        cls.group_2 = Group.objects.create(
+            title='Тестовая группа 2',
+            slug=SLUG_2,
+            description='Тестовое описание 2',
+        )
+        Post.objects.bulk_create(
+            Post(
+                author=(cls.user, cls.another_user)[i % 2],
+                text=f'Тестовый текст {i}-го поста',
+                group=(cls.group, cls.group_2, None)[i % 3],
+            ) for i in range(settings.LIMIT_OF_POSTS * 2)
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        groups_by_id()
+        self.guest = Client()
+
+    def test_feed_query_budget(self):
+        """Число запросов страницы ленты не зависит от числа постов,
+        группы берутся из кэша групп, а число постов - из валидаторов
+        conditional GET или счётчика автора, без отдельного COUNT(*)."""
+        urls = [
+            [INDEX_URL, 2],
+            [GROUP_LIST_URL_1, 2],
+            [PROFILE_URL, 3],
+        ]
+        for url, budget in urls:
+            with self.subTest(url=url):
+                with self.assertNumQueries(budget):
+                    self.guest.get(url)
@@ -0,0 +1,50 @@
+from django.conf import settings
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as sorl_defaults
+from sorl.thumbnail.conf import settings as sorl_settings
+from sorl.thumbnail.images import ImageFile
+
+
+class Backend(ThumbnailBackend):
+    def thumbnail_name(self, source, geometry_string, options):
+        """Имя файла миниатюры, параметры дополняются так же,
+        как в ThumbnailBackend.get_thumbnail."""
+        if sorl_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(sorl_settings, attr)
+            if value != getattr(sorl_defaults, attr):
+                options.setdefault(key, value)
+        return self._get_thumbnail_filename(source, geometry_string, options)
+
+    def get_cached_thumbnail(self, file_, geometry_string, **options):
+        """Миниатюра из хранилища ключей или None. В отличие от
+        get_thumbnail никогда не открывает и не обрабатывает картинку."""
+        name = self.thumbnail_name(ImageFile(file_), geometry_string, options)
+        return default.kvstore.get(ImageFile(name, default.storage))
+
+
+backend = Backend()
+
+
+def generate(image):
+    """Создаёт миниатюры всех размеров POST_THUMBNAILS."""
+    for geometry, options in settings.POST_THUMBNAILS.values():
+        backend.get_thumbnail(image, geometry, **options)
+
+
+def cached(post, size):
+    """Готовая миниатюра картинки поста или None, пока фоновая задача
+    её не создала."""
+    if not post.image or not post.thumbnails_ready:
+        return None
+    geometry, options = settings.POST_THUMBNAILS[size]
+    return backend.get_cached_thumbnail(post.image, geometry, **options)
+
+
+def delete(name):
+    """Удаляет миниатюры картинки и их записи, сама картинка остаётся."""
+    backend.delete(name, delete_file=False)
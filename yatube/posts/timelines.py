@@ -0,0 +1,145 @@
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+
+from .models import AuthorStats, Follow, Post, TimelineEntry
+from .paginators import NEXT, CursorPaginator, keyset
+
+
+def is_fanned_out(author_id):
+    """Раскладываются ли посты автора по лентам подписчиков."""
+    followers = AuthorStats.objects.filter(author_id=author_id).values_list(
+        'followers_count', flat=True
+    ).first() or 0
+    return followers <= settings.TIMELINE_FANOUT_LIMIT
+
+
+def fan_out(posts):
+    """Добавляет посты в ленты подписчиков авторов и самих авторов.
+
+    posts - пары (id поста, id автора). Посты авторов с числом
+    подписчиков больше TIMELINE_FANOUT_LIMIT попадают только в ленту
+    автора: подписчикам они подмешиваются при чтении.
+    """
+    by_author = defaultdict(list)
+    for post_id, author_id in posts:
+        by_author[author_id].append(post_id)
+    entries = []
+    for author_id, post_ids in by_author.items():
+        readers = {author_id}
+        if is_fanned_out(author_id):
+            readers.update(Follow.objects.filter(
+                author_id=author_id
+            ).values_list('user_id', flat=True))
+        entries.extend(
+            TimelineEntry(reader_id=reader_id, post_id=post_id)
+            for reader_id in readers for post_id in post_ids
+        )
+    with transaction.atomic():
+        TimelineEntry.objects.bulk_create(
+            entries, batch_size=1000, ignore_conflicts=True
+        )
+        trim({entry.reader_id for entry in entries})
+
+
+def trim(reader_ids):
+    """Обрезает ленты читателей до TIMELINE_MAX_LENGTH новых постов
+    в порядке ленты (pub_date, id), а не по id: импортированные
+    посты бывают старше уже разложенных."""
+    limit = settings.TIMELINE_MAX_LENGTH
+    overflowing = TimelineEntry.objects.filter(
+        reader_id__in=reader_ids
+    ).values('reader').annotate(total=Count('pk')).filter(
+        total__gt=limit
+    ).order_by().values_list('reader', flat=True)
+    for reader_id in overflowing:
+        timeline = TimelineEntry.objects.filter(reader_id=reader_id)
+        pub_date, post_id = timeline.order_by(
+            '-post__pub_date', '-post_id'
+        ).values_list('post__pub_date', 'post_id')[limit - 1]
+        timeline.filter(
+            Q(post__pub_date__lt=pub_date)
+            | Q(post__pub_date=pub_date, post_id__lt=post_id)
+        ).delete()
+
+
+def backfill(reader_id, author_id):
+    """Добавляет в ленту читателя последние посты нового автора."""
+    post_ids = Post.objects.filter(author_id=author_id).order_by(
+        '-pub_date', '-pk'
+    ).values_list('pk', flat=True)[:settings.TIMELINE_MAX_LENGTH]
+    with transaction.atomic():
+        TimelineEntry.objects.bulk_create(
+            (
+                TimelineEntry(reader_id=reader_id, post_id=post_id)
+                for post_id in post_ids
+            ),
+            batch_size=1000,
+            ignore_conflicts=True,
+        )
+        trim([reader_id])
+
+
+def remove_author(reader_id, author_id):
+    """Убирает из ленты читателя посты автора, от которого он отписался."""
+    TimelineEntry.objects.filter(
+        reader_id=reader_id, post__author_id=author_id
+    ).delete()
+
+
+def merged_authors(user):
+    """Популярные авторы читателя: их посты не раскладываются."""
+    return Follow.objects.filter(
+        user=user,
+        author__stats__followers_count__gt=settings.TIMELINE_FANOUT_LIMIT,
+    ).values_list('author', flat=True)
+
+
+class TimelinePaginator(CursorPaginator):
+    """Лента подписок пользователя по курсору.
+
+    Страница собирается из записей ленты читателя (их не больше
+    TIMELINE_MAX_LENGTH) и из limit новейших постов каждого
+    популярного автора по индексу (author, pub_date): таблица постов
+    целиком не читается и не сортируется.
+    """
+
+    def __init__(self, user, per_page):
+        super().__init__(None, per_page)
+        self.user = user
+
+    def fetch(self, direction, pub_date, pk, limit):
+        positions = set(keyset(
+            TimelineEntry.objects.filter(reader=self.user),
+            direction, pub_date, pk, date='post__pub_date', key='post',
+        ).values_list('post__pub_date', 'post')[:limit])
+        for author_id in merged_authors(self.user):
+            positions.update(keyset(
+                Post.objects.filter(author_id=author_id),
+                direction, pub_date, pk,
+            ).values_list('pub_date', 'pk')[:limit])
+        positions = sorted(positions, reverse=direction == NEXT)[:limit]
+        posts = Post.objects.for_feed().in_bulk(
+            [post_id for _, post_id in positions]
+        )
+        return [
+            posts[post_id] for _, post_id in positions if post_id in posts
+        ]
+
+
+def rebuild(readers):
+    """Пересобирает ленты читателей с нуля, возвращает их число."""
+    total = 0
+    for reader in readers:
+        with transaction.atomic():
+            TimelineEntry.objects.filter(reader=reader).delete()
+            authors = [reader.pk, *Follow.objects.filter(
+                user=reader
+            ).values_list('author_id', flat=True)]
+            for author_id in authors:
+                if author_id == reader.pk or is_fanned_out(author_id):
+                    backfill(reader.pk, author_id)
+        total += 1
+    return total
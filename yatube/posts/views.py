@@ -1,60 +1,145 @@
 from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.core.paginator import Paginator
+from django.db import transaction
+from django.http import HttpResponseBadRequest, StreamingHttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.http import urlencode
 
+from . import search as post_search
+from . import timelines
+from .cache import anonymous_page_cache, feed_state
+from .conditional import (
+    conditional_page, group_validators, index_validators, post_validators,
+    profile_validators
+)
+from .exporting import (
+    ENCODERS, encode, export_rows, gzip_stream, parse_period
+)
 from .forms import PostForm
-from .models import Group, Post, User
+from .groups import attach_groups, get_group_or_404, group_directory
+from .models import AuthorStats, Follow, Post, User
+from .paginators import CursorPaginator, FeedPaginator
 
 
-def get_page(stack, request):
-    return Paginator(stack, settings.LIMIT_OF_POSTS).get_page(
-        request.GET.get('page')
-    )
+def get_page(stack, request, count=None):
+    """count - функция, возвращающая известное число постов ленты,
+    избавляет от COUNT(*). Ленте по курсору число не нужно."""
+    if settings.FEED_PAGINATION == 'cursor':
+        page = CursorPaginator(stack, settings.LIMIT_OF_POSTS).get_page(
+            request.GET.get('cursor')
+        )
+    else:
+        page = FeedPaginator(
+            stack, settings.LIMIT_OF_POSTS, count=count and count()
+        ).get_page(request.GET.get('page'))
+    attach_groups(page.object_list)
+    return page
+
 
+def posts_count(author):
+    try:
+        return author.stats.posts_count
+    except AuthorStats.DoesNotExist:
+        return 0
 
+
+@conditional_page(index_validators)
+@anonymous_page_cache('index')
 def index(request):
     """Функция представления главной страницы проекта
     Yatube, с учётом сортировки количества постов для
     текущего приложения
     """
     return render(request, 'posts/index.html', {
-        'page_obj': get_page(Post.objects.all(), request),
+        'page_obj': get_page(
+            Post.objects.for_feed(), request,
+            count=lambda: feed_state('index', Post.objects.all())[1]['total'],
+        ),
     })
 
 
+@conditional_page(group_validators)
+@anonymous_page_cache('group:{slug}')
 def group_posts(request, slug):
     """Функция представления страницы групп для проекта
     Yatube, с учётом сортировки количества постов для
     текущего приложения
     """
-    group = get_object_or_404(Group, slug=slug)
+    group = get_group_or_404(slug)
     return render(request, 'posts/group_list.html', {
         'group': group,
-        'page_obj': get_page(group.posts.all(), request),
+        'page_obj': get_page(
+            group.posts.for_feed(), request,
+            count=lambda: feed_state(
+                f'group:{slug}', group.posts.all()
+            )[1]['total'],
+        ),
     })
 
 
+def group_index(request):
+    """Функция представления каталога групп"""
+    return render(request, 'posts/group_index.html', {
+        'groups': group_directory(),
+    })
+
+
+@conditional_page(profile_validators)
+@anonymous_page_cache('profile:{username}')
 def profile(request, username):
     """Фунеция представления страницы пользователя"""
-    author = get_object_or_404(User, username=username)
+    author = get_object_or_404(
+        User.objects.select_related('stats'), username=username
+    )
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user, author=author
+    ).exists()
     return render(request, 'posts/profile.html', {
         'author': author,
-        'page_obj': get_page(author.posts.all(), request),
+        'page_obj': get_page(
+            author.posts.for_feed('profile'), request,
+            count=lambda: posts_count(author),
+        ),
+        'following': following,
     })
 
 
+@conditional_page(post_validators)
 def post_detail(request, post_id):
     """Функция представления полной версии поста пользователя"""
     return render(request, 'posts/post_detail.html', {
-        'post': get_object_or_404(Post, pk=post_id),
+        'post': get_object_or_404(
+            Post.objects.select_related('author__stats', 'group'),
+            pk=post_id,
+        ),
+    })
+
+
+def search(request):
+    """Функция представления страницы поиска по текстам постов"""
+    query = request.GET.get('q', '').strip()
+    page_obj = FeedPaginator(
+        post_search.search(query) if query else [],
+        settings.LIMIT_OF_POSTS,
+    ).get_page(request.GET.get('page'))
+    posts = Post.objects.for_feed().in_bulk(page_obj.object_list)
+    page_obj.object_list = attach_groups([
+        posts[post_id] for post_id in page_obj.object_list
+        if post_id in posts
+    ])
+    return render(request, 'posts/search.html', {
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
     })
 
 
 @login_required
+@transaction.atomic
 def post_create(request):
     """Функция представления страницы создания нового поста"""
-    form = PostForm(request.POST or None)
+    form = PostForm(request.POST or None, files=request.FILES or None)
     if not form.is_valid():
         return render(request, 'posts/create_post.html', {'form': form})
     new_post = form.save(commit=False)
@@ -64,12 +149,15 @@ def post_create(request):
 
 
 @login_required
+@transaction.atomic
 def post_edit(request, post_id):
     """Функция представления редактирования поста пользователя"""
     post = get_object_or_404(Post, pk=post_id)
     if not request.user == post.author:
         return redirect('posts:post_detail', post_id)
-    form = PostForm(request.POST or None, instance=post)
+    form = PostForm(
+        request.POST or None, files=request.FILES or None, instance=post
+    )
     if not form.is_valid():
         return render(request, 'posts/create_post.html', {
             'form': form,
@@ -77,3 +165,60 @@ def post_edit(request, post_id):
         })
     form.save()
     return redirect('posts:post_detail', post_id)
+
+
+@login_required
+def follow_index(request):
+    """Функция представления ленты подписок пользователя"""
+    page_obj = timelines.TimelinePaginator(
+        request.user, settings.LIMIT_OF_POSTS
+    ).get_page(request.GET.get('cursor'))
+    attach_groups(page_obj.object_list)
+    return render(request, 'posts/follow.html', {'page_obj': page_obj})
+
+
+@login_required
+def profile_follow(request, username):
+    """Функция подписки на автора"""
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('posts:profile', username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    """Функция отписки от автора"""
+    author = get_object_or_404(User, username=username)
+    Follow.objects.filter(user=request.user, author=author).delete()
+    return redirect('posts:profile', username)
+
+
+@staff_member_required
+def export(request):
+    """Функция потоковой выгрузки постов для персонала"""
+    file_format = request.GET.get('format', 'jsonl')
+    if file_format not in ENCODERS:
+        file_format = 'jsonl'
+    try:
+        since = parse_period(request.GET.get('since'))
+        until = parse_period(request.GET.get('until'))
+    except ValueError as error:
+        return HttpResponseBadRequest(str(error))
+    chunks = encode(ENCODERS[file_format](export_rows(
+        author=request.GET.get('author'),
+        group=request.GET.get('group'),
+        since=since,
+        until=until,
+    )))
+    filename = f'posts.{file_format}'
+    content_type = 'application/x-ndjson' if file_format == 'jsonl' else (
+        'text/csv'
+    )
+    if request.GET.get('gzip'):
+        chunks = gzip_stream(chunks)
+        filename += '.gz'
+        content_type = 'application/gzip'
+    response = StreamingHttpResponse(chunks, content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
@@ -0,0 +1,74 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+
+from core.db_routers import read_primary
+
+CACHED_SESSION_ENGINES = (
+    'django.contrib.sessions.backends.cache',
+    'django.contrib.sessions.backends.cached_db',
+)
+LOCAL_CACHE_BACKEND = 'django.core.cache.backends.locmem.LocMemCache'
+
+
+def user_version(user_id):
+    """Поколение записи пользователя в кэше, меняется при каждом
+    сохранении пользователя."""
+    key = f'user-version:{user_id}'
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, time.time_ns(), None)
+        version = cache.get(key)
+    return version
+
+
+def invalidate_user(user_id):
+    key = f'user-version:{user_id}'
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, time.time_ns(), None)
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берёт пользователя сессии из кэша.
+
+    Запись кэша привязана к поколению пользователя: сохранение
+    пользователя (смена пароля, вход, правка профиля) меняет
+    поколение, и устаревшая копия, записанная параллельным запросом,
+    больше не читается. Другие процессы узнают о новом поколении
+    только через общий кэш, поэтому с LocMemCache backend
+    не используется (см. check_shared_cache). Копия для кэша читается
+    из основной базы, а не с отстающей реплики.
+    """
+
+    def get_user(self, user_id):
+        key = f'user:{user_id}:{user_version(user_id)}'
+        user = cache.get(key)
+        if user is None:
+            with read_primary():
+                user = super().get_user(user_id)
+            if user is None:
+                return None
+            cache.set(key, user, settings.USER_CACHE_TIMEOUT)
+        return user if self.user_can_authenticate(user) else None
+
+
+def check_shared_cache():
+    """Отказывается запускать сессии и пользователей из кэша,
+    если кэш у каждого процесса свой."""
+    cached = (
+        settings.SESSION_ENGINE in CACHED_SESSION_ENGINES
+        or f'{__name__}.CachedModelBackend'
+        in settings.AUTHENTICATION_BACKENDS
+    )
+    if cached and settings.CACHES['default']['BACKEND'] == (
+        LOCAL_CACHE_BACKEND
+    ):
+        raise ImproperlyConfigured(
+            'Сессии и пользователи из кэша требуют общего кэша '
+            '(memcached, redis), а не LocMemCache'
+        )
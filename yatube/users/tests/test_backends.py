@@ -0,0 +1,88 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core.management.commands.session_benchmark import PROFILES
+
+from ..backends import check_shared_cache
+
+User = get_user_model()
+
+ABOUT_URL = reverse('about:author')
+PASSWORD_CHANGE_URL = reverse('users:password_change_form')
+OLD_PASSWORD = 'old-Passw0rd!'
+NEW_PASSWORD = 'new-Passw0rd!'
+
+
+@override_settings(**PROFILES['cached'])
+class CachedSessionAndUserTest(TestCase):
+    @classmethod
+    def setUpClass(cls) -> None:
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='user', password=OLD_PASSWORD
+        )
+
+    def setUp(self) -> None:
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def test_session_and_user_read_from_cache(self):
+        """Повторный авторизованный запрос не обращается к базе
+        ни за сессией, ни за пользователем."""
+        self.client.get(ABOUT_URL)
+        with self.assertNumQueries(0):
+            response = self.client.get(ABOUT_URL)
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_saved_user_not_served_stale(self):
+        """Сохранение пользователя сбрасывает его копию в кэше."""
+        self.client.get(ABOUT_URL)
+        self.user.first_name = 'Новое имя'
+        self.user.save()
+        response = self.client.get(ABOUT_URL)
+        self.assertEqual(response.context['user'].first_name, 'Новое имя')
+
+    def test_password_change_rotates_sessions(self):
+        """Смена пароля меняет ключ сессии, автор остаётся в системе,
+        а другие его сессии завершаются."""
+        other = Client()
+        other.force_login(self.user)
+        other.get(ABOUT_URL)
+        self.client.get(ABOUT_URL)
+        old_key = self.client.session.session_key
+        self.client.post(PASSWORD_CHANGE_URL, {
+            'old_password': OLD_PASSWORD,
+            'new_password1': NEW_PASSWORD,
+            'new_password2': NEW_PASSWORD,
+        })
+        self.assertNotEqual(self.client.session.session_key, old_key)
+        self.assertTrue(
+            self.client.get(ABOUT_URL).context['user'].is_authenticated
+        )
+        self.assertFalse(other.get(ABOUT_URL).context['user'].is_authenticated)
+
+    def test_session_benchmark(self):
+        """Замер сравнивает число запросов сессии и пользователя."""
+        output = StringIO()
+        call_command('session_benchmark', iterations=2, stdout=output)
+        lines = output.getvalue().splitlines()
+        self.assertTrue(lines[1].startswith('db'))
+        self.assertEqual(lines[1].split()[1], '2')
+        self.assertEqual(lines[2].split()[1], '0')
+
+    def test_local_cache_refused(self):
+        """Сессии и пользователи из кэша не запускаются
+        с кэшем в памяти процесса."""
+        with self.assertRaises(ImproperlyConfigured):
+            check_shared_cache()
+        with override_settings(CACHES={'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        }}):
+            check_shared_cache()
@@ -0,0 +1,18 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+
+Django 2.2 has no native ASGI support: ``core.asgi.ASGIHandler`` runs the
+regular WSGI handler in a thread pool of ``ASGI_THREADS`` workers, so the
+event loop never blocks on database or template work. Run it with any
+ASGI 3 server, e.g. ``uvicorn yatube.asgi:application``.
+"""
+
+import os
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+from core.asgi import get_asgi_application  # noqa: E402
+
+application = get_asgi_application()
@@ -39,6 +39,7 @@ INSTALLED_APPS = [
     'posts.apps.PostsConfig',
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
+    'jobs.apps.JobsConfig',
     'about.apps.AboutConfig',
     'django.contrib.admin',
     'django.contrib.auth',
@@ -46,14 +47,18 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'sorl.thumbnail',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.StaticFilesMiddleware',
+    'core.middleware.RequestStatsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.ReplicaMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -63,12 +68,16 @@ ROOT_URLCONF = 'yatube.urls'
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
 CROP_TEXT = 15
+# Длина начала текста поста в ленте профиля, символов.
+POST_EXCERPT_LENGTH = 200
 LIMIT_OF_POSTS = 10
+# 'pages' - нумерованные страницы, 'cursor' - пагинация по ключу
+FEED_PAGINATION = 'pages'
 
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.template_backends.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -83,8 +92,15 @@ TEMPLATES = [
     },
 ]
 
+# Компилировать шаблоны проекта при старте WSGI/ASGI-процесса
+# (см. core.templates_warmup). Полезно только с кэширующим загрузчиком.
+TEMPLATE_WARMUP = False
+
 WSGI_APPLICATION = 'yatube.wsgi.application'
 
+# Размер пула потоков, в котором ASGI-точка входа выполняет запросы.
+ASGI_THREADS = 32
+
 
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
@@ -97,6 +113,57 @@ DATABASES = {
 }
 
 
+DATABASE_ROUTERS = ['core.db_routers.ReplicaRouter']
+
+# Псевдонимы баз-реплик из DATABASES. Пока список пуст, все запросы
+# идут в default. SQLite-реплики обновляет команда sync_replica.
+DATABASE_REPLICAS = []
+# Модели каких приложений и какие view читают с реплик.
+REPLICA_APPS = ('posts', 'auth')
+REPLICA_VIEWS = (
+    'posts:index',
+    'posts:group_list',
+    'posts:profile',
+    'posts:post_detail',
+    'about:author',
+    'about:tech',
+)
+# Сколько секунд после записи сессия читает из основной базы.
+REPLICA_STICKY_SECONDS = 10
+
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+POST_CARD_CACHE_TIMEOUT = 60 * 60 * 24
+FEED_PAGE_CACHE_TIMEOUT = 60
+GROUP_CACHE_TIMEOUT = 60 * 60
+# Сколько секунд процесс верит своей копии карты групп. С LocMemCache
+# (кэш у каждого процесса свой) так же долго живут и записи групп
+# в кэше: правки из других процессов видны не позже чем через это время.
+GROUP_LOCAL_TIMEOUT = 10
+
+REQUEST_STATS_ENABLED = True
+
+SEARCH_RESULTS_LIMIT = 1000
+
+# Длина персональной ленты подписок и число подписчиков, начиная
+# с которого посты автора не раскладываются по лентам, а
+# подмешиваются при чтении.
+TIMELINE_MAX_LENGTH = 800
+TIMELINE_FANOUT_LIMIT = 5000
+
+# Очередь фоновых задач (приложение jobs). Задачи выполняет команда
+# run_jobs; при JOBS_EAGER они выполняются сразу при постановке.
+JOBS_EAGER = False
+JOBS_MAX_ATTEMPTS = 5
+JOBS_RETRY_DELAY = 10
+JOBS_LOCK_TIMEOUT = 60 * 10
+
+
 # Password validation
 # https://docs.djangoproject.com/en/2.2/ref/settings/#auth-password-validators
 
@@ -135,9 +202,37 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+
+# Отдавать STATIC_ROOT через core.middleware.StaticFilesMiddleware.
+# Для файлов без хеша в имени - срок кэширования в секундах.
+STATIC_SERVE = False
+STATIC_MAX_AGE = 60
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+
+# Миниатюры картинок постов: размер -> (геометрия, параметры sorl).
+# Создаются фоновой задачей posts.make_thumbnails, ссылки на готовые
+# миниатюры хранятся в кэше с копией в базе.
+THUMBNAIL_KVSTORE = 'sorl.thumbnail.kvstores.cached_db_kvstore.KVStore'
+POST_THUMBNAILS = {
+    'feed': ('960x339', {'crop': 'center', 'upscale': True}),
+    'detail': ('1200', {'upscale': False}),
+}
+
+# Сессия и пользователь сессии читаются из базы. Профиль
+# yatube.settings_memcached берёт их из общего кэша; с LocMemCache
+# такой профиль не запускается, потому что копия в памяти одного
+# процесса не узнаёт о выходе и смене пароля в другом.
+# Время жизни пользователя в кэше users.backends.CachedModelBackend.
+USER_CACHE_TIMEOUT = 60 * 15
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
-EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
+# Письма ставятся в очередь задач и отправляются исполнителем run_jobs
+# через EMAIL_DELIVERY_BACKEND.
+EMAIL_BACKEND = 'jobs.mail.QueuedEmailBackend'
+EMAIL_DELIVERY_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
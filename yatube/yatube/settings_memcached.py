@@ -0,0 +1,16 @@
+"""Боевой профиль с общим для всех процессов кэшем memcached.
+
+Сессии и пользователь сессии читаются из кэша, база нужна только
+при записи. DJANGO_SETTINGS_MODULE=yatube.settings_memcached
+"""
+from .settings_prod import *  # noqa: F401,F403
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': '127.0.0.1:11211',
+    }
+}
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
@@ -0,0 +1,44 @@
+"""Профиль для небольших боевых инстансов на SQLite.
+
+DJANGO_SETTINGS_MODULE=yatube.settings_prod
+"""
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES, TEMPLATES
+
+DEBUG = False
+
+DATABASES = {
+    'default': {
+        **DATABASES['default'],
+        'ENGINE': 'core.backends.sqlite3',
+        # Соединение переиспользуется запросами потока десять минут.
+        'CONN_MAX_AGE': 600,
+        'OPTIONS': {
+            'timeout': 20,
+            'transaction_mode': 'IMMEDIATE',
+        },
+    },
+}
+
+# Шаблоны разбираются один раз на процесс и компилируются при его
+# старте, а не первым запросом.
+TEMPLATES = [{
+    **TEMPLATES[0],
+    'APP_DIRS': False,
+    'OPTIONS': {
+        **TEMPLATES[0]['OPTIONS'],
+        'loaders': [(
+            'django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ],
+        )],
+    },
+}]
+
+TEMPLATE_WARMUP = True
+
+# Имена статики с хешем содержимого и сжатые копии, которые создаёт
+# collectstatic. Перед запуском: python manage.py collectstatic.
+STATICFILES_STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+STATIC_SERVE = True